@@ -0,0 +1,93 @@
+# AssetManager.py
+import hashlib
+import os
+import struct
+
+try:
+    import pygame
+except ImportError:  # Headless servers run the simulation without pygame
+    pygame = None
+
+
+class AssetManager:
+    """
+    Lazily loaded, pre-scaled images for the visual mode.
+    get() loads an image the first time it is asked for, scales it to the requested size
+    and converts it to the display's pixel format (convert_alpha() for icons with
+    transparency), so later blits need no per-pixel conversion. Scaled images are also
+    written to cache_dir as raw pixel files named after a hash of the source file and the
+    target size: the next start copies the pre-scaled pixels straight into a surface
+    instead of decoding and scaling the original again (raw pixels also load faster than
+    a re-compressed PNG), and an edited source image or a new size simply misses the cache.
+    """
+
+    _RAW_HEADER = struct.Struct("!HH4s") # width, height, pygame pixel format ('RGB ' or 'RGBA')
+
+    def __init__(self, base_dir='.', cache_dir='.asset_cache'):
+        self.base_dir = base_dir
+        self.cache_dir = os.path.join(base_dir, cache_dir)
+        self._surfaces = {} # (name, size, alpha) -> Surface, or None if the image could not be loaded
+        self.disk_hits = 0
+        self.disk_misses = 0
+
+    def get(self, name, size=None, alpha=False):
+        """Returns the image `name` scaled to size (w, h) (None: original size), or None if it cannot be loaded."""
+        key = (name, size, alpha)
+        if key not in self._surfaces:
+            self._surfaces[key] = self._load(name, size, alpha)
+        return self._surfaces[key]
+
+    def _load(self, name, size, alpha):
+        path = os.path.join(self.base_dir, name)
+        try:
+            with open(path, 'rb') as source:
+                data = source.read()
+        except OSError:
+            return None
+
+        cache_path = None
+        if size is not None:
+            digest = hashlib.sha1(data).hexdigest()[:16]
+            stem = os.path.splitext(os.path.basename(name))[0]
+            variant = "-alpha" if alpha else ""
+            cache_path = os.path.join(self.cache_dir, f"{stem}-{digest}-{size[0]}x{size[1]}{variant}.raw")
+
+        surface = self._load_cached(cache_path) if cache_path is not None else None
+        if surface is not None:
+            self.disk_hits += 1
+        else:
+            try:
+                surface = pygame.image.load(path)
+            except pygame.error:
+                return None
+            if size is not None:
+                surface = pygame.transform.scale(surface, size)
+                self.disk_misses += 1
+                self._save(surface, cache_path, 'RGBA' if alpha else 'RGB')
+
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha() if alpha else surface.convert()
+        return surface
+
+    def _load_cached(self, cache_path):
+        """Returns the surface stored in a cache file, or None if it is missing or unreadable."""
+        try:
+            with open(cache_path, 'rb') as cached:
+                data = cached.read()
+            width, height, pixel_format = self._RAW_HEADER.unpack_from(data)
+            pixels = data[self._RAW_HEADER.size:]
+            return pygame.image.frombytes(pixels, (width, height), pixel_format.decode().strip())
+        except (OSError, struct.error, ValueError, pygame.error):
+            return None # Missing or corrupt entry: rebuilt from the source
+
+    def _save(self, surface, cache_path, pixel_format):
+        """Writes a scaled image to the disk cache; the cache is an optimization, so failures are ignored."""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            header = self._RAW_HEADER.pack(surface.get_width(), surface.get_height(), pixel_format.ljust(4).encode())
+            temp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as cached:
+                cached.write(header + pygame.image.tobytes(surface, pixel_format))
+            os.replace(temp_path, cache_path) # Another process never sees a half-written file
+        except (OSError, pygame.error) as e:
+            print(f"Warning: Could not cache scaled image {cache_path}: {e}")
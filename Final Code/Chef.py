@@ -1,6 +1,7 @@
 # Chef.py
 import time
 import random
+from Pizza import Pizza
 
 class Chef:
     def __init__(self, x, y, ovens, pans):
@@ -13,79 +14,67 @@ class Chef:
         self.ovens = ovens # References to all ovens
         self.pans = pans   # References to all pans
 
-    def prepare_order(self, restaurant, order_data):
-        """Restaurant sends order to Chef (Sequence Diagram)."""
+    def prepare_order(self, restaurant, order):
+        """Restaurant sends order to Chef (Sequence Diagram).
+        The chef stays assigned to the order until all of its items are cooked."""
         if not self.ChefAvailable:
             return False # Should not happen if called correctly
 
         self.ChefAvailable = False
-        self.current_task = order_data
-        print(f"[{self.Name}] Preparing order {order_data['order_id']}. Items: {order_data['total_items']}")
-        
-        # Chef is now busy coordinating cooking/baking.
-        
-        
-        items_to_process = self.current_task['items']
-        
-        # Assign tasks based on items
-        for item in items_to_process:
-            item_type = item[1]
-            if item_type == 'pizza':
-                self._cook_pizza(restaurant, item)
-            elif item_type == 'pasta':
-                self._cook_pasta(restaurant, item)
+        self.current_task = order
+        print(f"[{self.Name}] Preparing order {order.OrderID}. Items: {len(order.Products)}")
 
-        
-        self.current_task = None
-        self.ChefAvailable = True # Chef is available to take the next order
-
-    def get_available_oven(self):
-        for oven in self.ovens:
-            if oven.Available:
-                return oven
-        return None
+        # Assign tasks based on items; the restaurant's equipment pools queue
+        # whatever cannot start yet and dispatch it when a unit frees up
+        for item in order.Products:
+            if item.__class__ is Pizza:
+                self._cook_pizza(restaurant, item, order)
+            else:
+                self._cook_pasta(restaurant, item, order)
+        return True
 
-    def get_available_pan(self):
-        for pan in self.pans:
-            if pan.Available:
-                return pan
-        return None
+    def finish_order(self):
+        """All items of the current order are cooked: the chef is free for the next order."""
+        self.current_task = None
+        self.ChefAvailable = True
 
-    def _cook_pizza(self, restaurant, pizza_item):
+    def _cook_pizza(self, restaurant, pizza, order):
         """Chef sends Pizza to Oven (Sequence Diagram)."""
-        oven = self.get_available_oven()
-        if oven:
-            # Transition: HasPizza / [IsAvailable()] / CookPizza(oven)
-            oven.bake_pizza(restaurant, self, pizza_item)
-            print(f"[{self.Name}] Sent Pizza to {oven.__class__.__name__}.")
-        else:
-            print(f"[{self.Name}] Warning: No available Oven for Pizza.")
-            # In a real system, the chef would wait or queue the task
+        # Transition: HasPizza / [IsAvailable()] / CookPizza(oven)
+        if not restaurant.OvenPool.request(self._start_baking, restaurant, pizza, order):
+            print(f"[{self.Name}] All ovens busy, Pizza {pizza.PizzaID} queued "
+                  f"({restaurant.OvenPool.waiting_count()} waiting).")
 
-    def _cook_pasta(self, restaurant, pasta_item):
+    def _cook_pasta(self, restaurant, pasta, order):
         """Chef sends Pasta to Pan (Sequence Diagram)."""
-        pan = self.get_available_pan()
-        if pan:
-            # Transition: HasPasta / [IsAvailable()] / CookPasta(pan)
-            pan.cook_pasta(restaurant, self, pasta_item)
-            print(f"[{self.Name}] Sent Pasta to {pan.__class__.__name__}.")
-        else:
-            print(f"[{self.Name}] Warning: No available Pan for Pasta.")
-            # In a real system, the chef would wait or queue the task
+        # Transition: HasPasta / [IsAvailable()] / CookPasta(pan)
+        if not restaurant.PanPool.request(self._start_cooking, restaurant, pasta, order):
+            print(f"[{self.Name}] All pans busy, Pasta {pasta.PastaID} queued "
+                  f"({restaurant.PanPool.waiting_count()} waiting).")
+
+    def _start_baking(self, oven, restaurant, pizza, order):
+        """Called by the oven pool once an oven is assigned to the pizza."""
+        oven.bake_pizza(restaurant, self, pizza, order)
+        print(f"[{self.Name}] Sent Pizza to {oven.__class__.__name__}.")
+
+    def _start_cooking(self, pan, restaurant, pasta, order):
+        """Called by the pan pool once a pan is assigned to the pasta."""
+        pan.cook_pasta(restaurant, self, pasta, order)
+        print(f"[{self.Name}] Sent Pasta to {pan.__class__.__name__}.")
 
     # --- Sequence Diagram: Equipment -> Chef Status Update ---
 
-    def receive_cooking_status(self, restaurant, status: str, item_name: str, item_type: str):
+    def receive_cooking_status(self, restaurant, status: str, item, order):
         """
         Receives status from Oven/Pan (Sequence Diagram - dashed line).
         Transition: [GetStatus() == 'done'] / AddPizza() or AddPasta()
         """
         if status == 'done':
-            print(f"[{self.Name}] Received 'done' status for {item_name} ({item_type}).")
-            
+            print(f"[{self.Name}] Received 'done' status for {item.ItemID} ({item.Type}).")
+
             # Chef notifies Restaurant that the item is ready
-            restaurant.notify_cooking_status(item_name, 'done', item_type)
-        
+            restaurant.notify_cooking_status(item, 'done', order)
+
     def update(self, restaurant):
         """Chef's update loop (simplified) - mainly for visual updates in this model."""
-        pass
\ No newline at end of file
+        pass
@@ -1,10 +1,15 @@
 # City.py
-import pygame
 import random
 import math
+from SpatialIndex import KDTree
+from TextCache import TextCache
+from AssetManager import AssetManager
+
+try:
+    import pygame
+except ImportError:  # Headless servers run the simulation without pygame
+    pygame = None
 
-pygame.init()
-screen_info = pygame.display.Info()
 SCREEN_WIDTH = 1200
 SCREEN_HEIGHT = 720
 
@@ -19,54 +24,105 @@ RESTAURANT_POSITIONS = [(870, 548), (200, 560), (570, 190)]
 HOUSE_ICON_SIZE = (30, 30) 
 
 class City:
-    def __init__(self, name, population, size):
+    def __init__(self, name, population, size, text_cache=None, assets=None):
         self.Name = name
         self.Population = population
         self.Size = size
         self.Restaurant = []
         self.restaurant_positions = []
+        self._position_by_restaurant = {} # restaurant -> (x, y), O(1) lookup
+        self._restaurant_index = None     # KDTree over restaurant positions, rebuilt lazily
+        self._nearest_by_house = {}       # house (x, y) -> (restaurant, position), precomputed
         self.MinimumDistance = 100
         self.houseCoords = houseCoords
+        self.text_cache = text_cache if text_cache is not None else TextCache() # Rendered labels, shared with Main.draw
+        self.assets = assets if assets is not None else AssetManager()
+        self.image_city = None
+        self.image_house = None
+        self.image_restaurant = None
+        self._images_loaded = False
+        self.REST_ICON_SIZE = (50, 50)
+        self.width_icon, self.height_icon = self.REST_ICON_SIZE
+        self.background = None # Map + restaurant icons + houses composed once, see get_background()
 
-        # Visual properties
-        try:
-            self.image_city = pygame.image.load('city_map_new.jpeg')
-            self.image_city = pygame.transform.scale(self.image_city, (SCREEN_WIDTH, SCREEN_HEIGHT))
-        except pygame.error:
+    def _load_images(self):
+        """Loads the map and icon images used for drawing. Called on the first draw, not at
+        construction, so setup (and headless mode) never pays for image decoding."""
+        self._images_loaded = True
+        self.image_city = self.assets.get('city_map_new.jpeg', (SCREEN_WIDTH, SCREEN_HEIGHT))
+        if self.image_city is None:
             print("City map image not found, creating blank background")
             self.image_city = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
             self.image_city.fill((200, 200, 200))
 
         # --- Load Icons ---
-        try:
-            self.image_house = pygame.image.load('house_icon.png').convert_alpha()
-            self.image_house = pygame.transform.scale(self.image_house, HOUSE_ICON_SIZE)
-        except pygame.error:
-            self.image_house = None
-        self.REST_ICON_SIZE = (50, 50)
-        self.width_icon, self.height_icon = self.REST_ICON_SIZE
-        try:
-            self.image_restaurant = pygame.image.load('italiën_restaurant.png').convert_alpha()
-            self.image_restaurant = pygame.transform.scale(self.image_restaurant, self.REST_ICON_SIZE)
-        except pygame.error:
-            self.image_restaurant = None
+        self.image_house = self.assets.get('house_icon.png', HOUSE_ICON_SIZE, alpha=True)
+        self.image_restaurant = self.assets.get('italiën_restaurant.png', self.REST_ICON_SIZE, alpha=True)
 
     def get_restaurant_position(self, restaurant):
         """Returns the map position (x, y) of a given restaurant object."""
-        try:
-            index = self.Restaurant.index(restaurant)
-            return self.restaurant_positions[index]
-        except ValueError:
-            return None
+        return self._position_by_restaurant.get(restaurant)
+
+    def _build_restaurant_index(self):
+        """Builds the k-d tree over restaurant positions and the house -> nearest restaurant table."""
+        self._restaurant_index = KDTree(self.restaurant_positions, self.Restaurant)
+        self._nearest_by_house = {}
+        for house in self.houseCoords:
+            nearest = self._restaurant_index.nearest(house, k=1)
+            if nearest:
+                _, position, restaurant = nearest[0]
+                self._nearest_by_house[house] = (restaurant, position)
+
+    def find_nearest_restaurants(self, coords, k=1):
+        """Returns up to k (distance, position, restaurant) tuples, closest first. O(log n) per query."""
+        if self._restaurant_index is None:
+            self._build_restaurant_index()
+        return self._restaurant_index.nearest(coords, k)
+
+    def find_nearest_restaurant(self, coords):
+        """Returns (restaurant, position) of the closest restaurant, or (None, None).
+        Known house coordinates are answered from the precomputed table in O(1)."""
+        if self._restaurant_index is None:
+            self._build_restaurant_index()
+        nearest = self._nearest_by_house.get(tuple(coords))
+        if nearest:
+            return nearest
+        found = self._restaurant_index.nearest(coords, k=1)
+        if not found:
+            return None, None
+        _, position, restaurant = found[0]
+        return restaurant, position
 
     def show_city_map(self, screen):
         """Draw the city map background."""
+        if not self._images_loaded:
+            self._load_images()
         screen.blit(self.image_city, (0, 0))
 
+    def get_background(self, font_small):
+        """Returns the static layer of the map: the city image, restaurant icons, houses and house
+        numbers, composed into one surface the first time it is needed. Only the dynamic layers
+        (status labels, drones, HUD) are drawn over it each frame. Rebuilt after add_restaurant()."""
+        if self.background is None:
+            if not self._images_loaded:
+                self._load_images()
+            background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+            if pygame.display.get_surface() is not None:
+                background = background.convert() # Display pixel format: blits need no conversion
+            background.fill((255, 255, 255))
+            self.show_city_map(background)
+            self.draw_restaurant_icons(background)
+            self.draw_customer_houses(background, font_small)
+            self.background = background
+        return self.background
+
     def add_restaurant(self, restaurant, position):
         """Adds a restaurant and its map position."""
         self.Restaurant.append(restaurant)
         self.restaurant_positions.append(position)
+        self._position_by_restaurant[restaurant] = position
+        self._restaurant_index = None # Rebuilt on the next query
+        self.background = None        # The icon is part of the static layer
 
     # --- MODIFIED METHOD: Now accepts font object to draw numbers ---
     def draw_customer_houses(self, screen, font_small): 
@@ -84,7 +140,7 @@ class City:
                 pygame.draw.circle(screen, HOUSE_COLOR, (x, y), HOUSE_RADIUS, 0)
             
             # 2. Draw House Number 
-            text_surface = font_small.render(str(house_num), True, (0, 0, 0)) # Black text
+            text_surface = self.text_cache.render(font_small, str(house_num), (0, 0, 0)) # Black text
             # Position the text 10 pixels above the house icon's top edge
             text_rect = text_surface.get_rect(center=(x, y - half_h - 10)) 
             screen.blit(text_surface, text_rect)
@@ -93,30 +149,39 @@ class City:
     # --- MODIFIED: Added restaurant_statuses and font_medium parameters ---
     def show_restaurant_icon(self, screen, font_medium, restaurant_statuses, restPos=None):
         """Show restaurant icons and their status on the map, using the icon if available."""
+        self.draw_restaurant_icons(screen, restPos)
+        self.draw_restaurant_statuses(screen, font_medium, restaurant_statuses, restPos)
+    # --------------------------------------------------------------------
+
+    def draw_restaurant_icons(self, screen, restPos=None):
+        """Draw the restaurant icons (part of the static background)."""
         if restPos is None:
             restPos = self.restaurant_positions
 
         half_w, half_h = self.REST_ICON_SIZE[0] // 2, self.REST_ICON_SIZE[1] // 2
-        
-        for i, (xi, yi) in enumerate(restPos):
-            # 1. Draw Icon
+        for xi, yi in restPos:
             if self.image_restaurant:
                 screen.blit(self.image_restaurant, (xi - half_w, yi - half_h))
             else:
-                pygame.draw.circle(screen, (0, 150, 0), (xi, yi), self.width_icon // 2, 0) 
+                pygame.draw.circle(screen, (0, 150, 0), (xi, yi), self.width_icon // 2, 0)
                 pygame.draw.circle(screen, (255, 255, 255), (xi, yi), self.width_icon // 3, 0)
-                
-            # 2. Draw Status Text 
-            if i < len(restaurant_statuses):
-                status_text = restaurant_statuses[i]
-                # Render text (Black text on a small white rectangle for map visibility)
-                text_surface = font_medium.render(status_text, True, (0, 0, 0), (255, 255, 255)) 
-                
-                # Position the text slightly to the right of the icon and centered vertically
-                text_x = xi + half_w + 5 
-                text_y = yi - (text_surface.get_height() // 2)
-                screen.blit(text_surface, (text_x, text_y))
-    # --------------------------------------------------------------------
+
+    def draw_restaurant_statuses(self, screen, font_medium, restaurant_statuses, restPos=None):
+        """Draw the status label next to each restaurant icon. Returns the rects drawn to."""
+        if restPos is None:
+            restPos = self.restaurant_positions
+
+        half_w = self.REST_ICON_SIZE[0] // 2
+        rects = []
+        for (xi, yi), status_text in zip(restPos, restaurant_statuses):
+            # Render text (Black text on a small white rectangle for map visibility)
+            text_surface = self.text_cache.render(font_medium, status_text, (0, 0, 0), (255, 255, 255))
+
+            # Position the text slightly to the right of the icon and centered vertically
+            text_x = xi + half_w + 5
+            text_y = yi - (text_surface.get_height() // 2)
+            rects.append(screen.blit(text_surface, (text_x, text_y)))
+        return rects
 
     def open_restaurant_icon(self, mousepoint):
         """Check if mouse is over a restaurant icon"""
@@ -1,4 +1,7 @@
 import random
+from Order import Order
+from Pizza import Pizza
+from Pasta import Pasta
 
 
 class Customer:
@@ -11,9 +14,10 @@ class Customer:
         self.pasta_id_counter = 2000  # Start pasta IDs at 2000
         self.orders_received_count = 0
 
-    def GenerateOrder(self):
-        """Generate an order with multiple pizzas and/or pastas"""
-        order_id = random.randint(1000, 9999)
+    def GenerateOrder(self, order_id=None):
+        """Generate an order with multiple pizzas and/or pastas (an Order of Pizza/Pasta objects)"""
+        if order_id is None:
+            order_id = random.randint(1000, 9999)
 
         # Decide how many items in this order (1-3 items)
         num_items = random.randint(1, 3)
@@ -23,25 +27,17 @@ class Customer:
             item_type = random.choice(['pizza', 'pasta'])
 
             if item_type == 'pizza':
-                order_items.append(self._generate_pizza_item())
+                order_items.append(Pizza(self._generate_pizza_item()))
             else:
-                order_items.append(self._generate_pasta_item())
+                order_items.append(Pasta(self._generate_pasta_item()))
 
         # Combine all items into one order
-        order_data = {
-            'order_id': order_id,
-            'customer_id': self.CustomerID,
-            'customer_address': self.CustomerAddress,
-            'items': order_items,
-            'total_items': num_items
-        }
+        return Order(order_id, self.CustomerID, self.CustomerAddress, order_items)
 
-        return order_data
-
-    def ReceiveOrder(self, order_data):
+    def ReceiveOrder(self, order):
         """Customer receives and confirms the order (Sequence Diagram)."""
         self.orders_received_count += 1
-        print(f"[{self.CustomerID}] RECEIVED Order {order_data['order_id']} successfully! Items: {order_data['total_items']}. Total received: {self.orders_received_count}")
+        print(f"[{self.CustomerID}] RECEIVED Order {order.OrderID} successfully! Items: {len(order.Products)}. Total received: {self.orders_received_count}")
 
 
     def _generate_pizza_item(self):
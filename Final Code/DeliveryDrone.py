@@ -1,81 +1,132 @@
 # DeliveryDrone.py
-import time
-import random
 import math
+from FleetState import FleetState
 
 class DeliveryDrone:
-    def __init__(self, drone_id, home_pos):
+    """
+    A drone of the DroneFleet. Position, home, current leg and status live in the
+    fleet's FleetState arrays (row self.row); this object holds the order being
+    carried and the delivery flow: pickup -> customer -> dropoff -> next order or base.
+    """
+
+    def __init__(self, drone_id, home_pos, fleet):
         self.DroneID = drone_id
-        self.Available = True
+        self.fleet = fleet
+        self.clock = fleet.clock # Simulation clock (real, scaled or virtual)
+        self.state = fleet.state
         self.delivery_task = None
-        self.delivery_end_time = 0
-        
-        # Position tracking for visualization
-        self.HomePos = home_pos # (x, y) of the restaurant
-        self.x = home_pos[0]
-        self.y = home_pos[1]
+        self.delivery_restaurant = None # Restaurant that prepared the order being carried
+        self.delivery_end_time = 0 # Expected time the order is dropped off
+        self.trip_start_time = 0
+        self.dropoff_time = 1 # seconds spent at the customer
         self.target_x = home_pos[0]
         self.target_y = home_pos[1]
         self.speed = 40 # Pixels per second (for visualization)
-        self.Status = "IDLE"
+        self._on_arrival = None # Called by the fleet when the current leg ends
+        self.row = fleet.add_drone(self, home_pos) # Row of this drone in the FleetState arrays
+
+    # --- Views over the FleetState row ---
+
+    @property
+    def x(self):
+        return float(self.state.position[self.row, 0])
+
+    @property
+    def y(self):
+        return float(self.state.position[self.row, 1])
+
+    @property
+    def HomePos(self):
+        """(x, y) of the restaurant the drone is based at."""
+        return tuple(self.state.home[self.row].tolist())
+
+    @HomePos.setter
+    def HomePos(self, position):
+        self.state.home[self.row] = position
 
-    def deliver_order(self, restaurant, order_data, customer_x, customer_y):
-        """Receives Completed order from Restaurant (Sequence Diagram)."""
+    @property
+    def Available(self):
+        return self.state.status[self.row] == FleetState.IDLE
+
+    @property
+    def Status(self):
+        status = self.state.status[self.row]
+        name = FleetState.STATUS_NAMES[status]
+        if status in (FleetState.PICKUP, FleetState.TRAVELING):
+            return f"{name} ({self.delivery_task.OrderID})"
+        return name
+
+    def _set_status(self, status):
+        self.state.status[self.row] = status
+
+    # --- Delivery flow ---
+
+    def deliver_order(self, restaurant, order, customer_x, customer_y):
+        """Receives Completed order from Restaurant (Sequence Diagram).
+        The drone first flies to the restaurant to pick the order up, then to the customer."""
         if not self.Available:
             return False
 
-        self.Available = False
-        self.Status = "DELIVERING"
-        
-        # Store full order data and customer coordinates
-        self.delivery_task = order_data
+        # Store the order and customer coordinates
+        self.delivery_task = order
+        self.delivery_restaurant = restaurant
         self.target_x = customer_x
         self.target_y = customer_y
-        
-        # Calculate distance and actual delivery time for realism
-        # Note: Using straight line distance (Pythagorean theorem)
-        distance = math.sqrt((self.target_x - self.x)**2 + (self.target_y - self.y)**2)
-        
-        # Time to travel one way + return trip + 1s dropoff
-        travel_time = distance / self.speed
-        self.delivery_time_seconds = travel_time * 2 + 1 
-        self.delivery_end_time = time.time() + self.delivery_time_seconds
-        
-        print(f"[Drone {self.DroneID}] Started delivery of order {order_data['order_id']} to {order_data['customer_address']}. ETA {self.delivery_time_seconds:.1f}s.")
+
+        pickup_pos = restaurant.system_reference.city.get_restaurant_position(restaurant)
+        self.trip_start_time = self.clock.now()
+        self._set_status(FleetState.PICKUP)
+        pickup_end_time = self._start_leg(pickup_pos, self.pick_up)
+
+        # Pickup leg + delivery leg + dropoff (what happens next depends on the fleet)
+        delivery_leg = math.hypot(customer_x - pickup_pos[0], customer_y - pickup_pos[1]) / self.speed
+        self.delivery_end_time = pickup_end_time + delivery_leg + self.dropoff_time
+
+        print(f"[Drone {self.DroneID}] Started delivery of order {order.OrderID} to {order.CustomerAddress}. ETA {self.delivery_end_time - self.trip_start_time:.1f}s.")
         return True
 
-    def update(self, restaurant):
-        if not self.Available:
-            if time.time() < self.delivery_end_time:
-                # Update position based on time elapsed
-                time_elapsed = time.time() - (self.delivery_end_time - self.delivery_time_seconds)
-                
-                # Simplified movement: directly towards target during first half, directly back during second half
-                half_time = self.delivery_time_seconds / 2
-                
-                if time_elapsed < half_time:
-                    # Going to customer
-                    t = time_elapsed / half_time
-                    self.x = self.HomePos[0] + t * (self.target_x - self.HomePos[0])
-                    self.y = self.HomePos[1] + t * (self.target_y - self.HomePos[1])
-                    self.Status = f"TRAVELING ({self.delivery_task['order_id']})"
-                else:
-                    # Returning to base
-                    t = (time_elapsed - half_time) / half_time
-                    self.x = self.target_x + t * (self.HomePos[0] - self.target_x)
-                    self.y = self.target_y + t * (self.HomePos[1] - self.target_y)
-                    self.Status = "RETURNING"
-                
-            else:
-                # Delivery complete
-                completed_order = self.delivery_task
-                
-                # Delivered() / CompleteOrder(order_data) -> calls Restaurant to complete
-                restaurant.complete_order(completed_order) 
-
-                print(f"[Drone {self.DroneID}] Delivery complete and returned to base.")
-                self.Available = True
-                self.delivery_task = None
-                self.x = self.HomePos[0]
-                self.y = self.HomePos[1]
-                self.Status = "IDLE"
+    def _start_leg(self, target, on_arrival):
+        """Starts a straight flight to target; the fleet calls arrive() when it ends. Returns the end time."""
+        self._on_arrival = on_arrival
+        end_time = self.state.start_leg(self.row, target, self.clock.now(), self.speed)
+        self.fleet.leg_started(end_time)
+        return end_time
+
+    def arrive(self):
+        """Called by the fleet once the current leg has ended (the position is already at the target)."""
+        on_arrival, self._on_arrival = self._on_arrival, None
+        on_arrival()
+
+    def pick_up(self):
+        """Pickup event: the drone is at the restaurant and flies the order to the customer."""
+        self._set_status(FleetState.TRAVELING)
+        self._start_leg((self.target_x, self.target_y), self.arrive_at_customer)
+
+    def arrive_at_customer(self):
+        """Delivery-arrival event: the order is handed over, so it is completed."""
+        completed_order = self.delivery_task
+        restaurant = self.delivery_restaurant
+        self.delivery_task = None
+        self.delivery_restaurant = None
+        self._set_status(FleetState.DROPPING_OFF)
+
+        # Delivered() / CompleteOrder(order) -> calls Restaurant to complete
+        restaurant.complete_order(completed_order)
+        self.fleet.scheduler.schedule(self.dropoff_time, self._finish_dropoff)
+
+    def _finish_dropoff(self):
+        """After the dropoff the drone takes the next waiting order, or repositions to a base."""
+        self._set_status(FleetState.IDLE)
+        self.fleet.record_trip(self.clock.now() - self.trip_start_time)
+        if self.fleet.drone_free(self):
+            return
+
+        self.HomePos = self.fleet.choose_base((self.x, self.y))
+        self._set_status(FleetState.RETURNING)
+        self._start_leg(self.HomePos, self.return_to_base)
+
+    def return_to_base(self):
+        """Drone-return event: the drone is idle at its (possibly new) base."""
+        print(f"[Drone {self.DroneID}] Delivery complete and returned to base.")
+        self._set_status(FleetState.IDLE)
+        self.fleet.drone_idle(self)
@@ -0,0 +1,128 @@
+# DroneFleet.py
+from collections import deque
+from FleetState import FleetState
+from SpatialIndex import SpatialGrid
+
+
+class DroneFleet:
+    """
+    City-wide dispatcher that owns every DeliveryDrone.
+    Packaged orders get the nearest idle drone (looked up in a spatial grid of idle drones);
+    when no drone is idle, the order waits in a queue and the next drone that drops an order off
+    flies straight to the nearest of the oldest waiting orders. With nothing waiting, a drone
+    repositions to the restaurant nearest to its last customer.
+
+    Drone kinematics live in one FleetState; instead of one scheduler event per drone leg, the
+    fleet keeps a single wake-up event at the earliest leg end and finishes every due leg at once.
+    """
+
+    def __init__(self, city, scheduler, clock, cell_size=100, pending_window=8):
+        self.city = city
+        self.scheduler = scheduler
+        self.clock = clock
+        self.state = FleetState()
+        self._wake_event = None # Scheduler event for the earliest leg end
+        self._wake_time = None
+        self.pending_window = pending_window # How many of the oldest waiting orders a free drone picks from
+        self.drones = []
+        self._idle = SpatialGrid(cell_size) # Idle drones by position
+        self._pending = deque()             # (restaurant, order_id) waiting for a drone
+        self.trips_completed = 0
+        self.total_trip_time = 0.0
+
+    def add_drone(self, drone, home_pos):
+        """Registers a new drone parked at home_pos. Returns its FleetState row (== index in self.drones)."""
+        row = self.state.add(home_pos)
+        self.drones.append(drone)
+        self._idle.insert(drone, tuple(home_pos))
+        return row
+
+    def leg_started(self, end_time):
+        """Called when a drone starts a leg: moves the wake-up event earlier if needed."""
+        if self._wake_event is not None and self._wake_time <= end_time:
+            return
+        if self._wake_event is not None:
+            self.scheduler.cancel(self._wake_event)
+        self._wake_time = end_time
+        self._wake_event = self.scheduler.schedule_at(end_time, self._wake)
+
+    def _wake(self):
+        """Finishes every leg that has ended (one vectorized pass) and re-arms for the next one."""
+        self._wake_event = None
+        for row in self.state.finish_legs(self.clock.now()).tolist():
+            self.drones[row].arrive()
+        next_end_time = self.state.next_end_time()
+        if next_end_time is not None:
+            self.leg_started(next_end_time)
+
+    def update_positions(self, now=None):
+        """Interpolates every flying drone's position for drawing, at `now` (default: the current simulated time)."""
+        self.state.update_positions(self.clock.now() if now is None else now)
+
+    def request_drone(self, restaurant, order_id):
+        """Assigns the nearest idle drone to a packaged order, or queues the order until one is free."""
+        pickup_pos = self.city.get_restaurant_position(restaurant)
+        nearest = self._idle.nearest(pickup_pos)
+        if nearest is None:
+            self._pending.append((restaurant, order_id))
+            print(f"[Fleet] No idle drone for order {order_id}. Waiting orders: {len(self._pending)}")
+            return False
+
+        _, drone, _ = nearest
+        self._idle.remove(drone)
+        restaurant.start_delivery(order_id, drone)
+        return True
+
+    def record_trip(self, trip_time):
+        """Tracks assignment-to-dropoff time, used by estimate_wait()."""
+        self.trips_completed += 1
+        self.total_trip_time += trip_time
+
+    def drone_free(self, drone):
+        """Called when a drone has dropped an order off: it takes a waiting order, if there is one."""
+        if not self._pending:
+            return False
+        restaurant, order_id = self._pop_pending_near((drone.x, drone.y))
+        restaurant.start_delivery(order_id, drone)
+        return True
+
+    def drone_idle(self, drone):
+        """Called by a drone back at a base: it takes a waiting order, or joins the idle pool."""
+        if not self.drone_free(drone):
+            self._idle.insert(drone, drone.HomePos)
+
+    def _pop_pending_near(self, position):
+        """Removes and returns the waiting order nearest to position among the oldest pending_window."""
+        best_index, best_distance = 0, float('inf')
+        for index in range(min(self.pending_window, len(self._pending))):
+            restaurant, _ = self._pending[index]
+            pickup_x, pickup_y = self.city.get_restaurant_position(restaurant)
+            distance = (pickup_x - position[0]) ** 2 + (pickup_y - position[1]) ** 2
+            if distance < best_distance:
+                best_index, best_distance = index, distance
+        entry = self._pending[best_index]
+        del self._pending[best_index]
+        return entry
+
+    def choose_base(self, position):
+        """Restaurant position a drone should return to after a delivery at `position`."""
+        _, base = self.city.find_nearest_restaurant(position)
+        return base if base else position
+
+    def estimate_wait(self, position):
+        """Predicted seconds until a drone can be at `position` to pick an order up."""
+        if not self.drones:
+            return float('inf')
+        nearest = self._idle.nearest(position)
+        if nearest is not None:
+            return nearest[0] / self.drones[0].speed
+
+        # Every drone is busy: orders already waiting go first, spread over the whole fleet
+        average_trip = self.total_trip_time / self.trips_completed if self.trips_completed else 0.0
+        return (len(self._pending) + 1) * average_trip / len(self.drones)
+
+    def idle_count(self):
+        return len(self._idle)
+
+    def pending_count(self):
+        return len(self._pending)
@@ -0,0 +1,52 @@
+# EquipmentPool.py
+from collections import deque
+
+
+class EquipmentPool:
+    """
+    Pool of identical kitchen units (all Ovens or all Pans of one restaurant).
+    Free units sit on a free-list, so checkout and release are O(1). Work that
+    arrives while every unit is busy waits in a FIFO queue and is started
+    automatically as soon as a unit is released.
+    """
+
+    def __init__(self, name):
+        self.Name = name
+        self.units = []
+        self._free = deque()    # Units that are available right now
+        self._waiting = deque() # (start_callback, args) for work waiting on a unit
+
+    def add(self, unit):
+        self.units.append(unit)
+        self._free.append(unit)
+
+    def checkout(self):
+        """Takes a free unit off the free-list, or returns None when all are busy."""
+        return self._free.popleft() if self._free else None
+
+    def request(self, start, *args):
+        """Runs start(unit, *args) on a free unit now, or queues it until one is released.
+        Returns True if the work started immediately."""
+        unit = self.checkout()
+        if unit is None:
+            self._waiting.append((start, args))
+            return False
+        start(unit, *args)
+        return True
+
+    def release(self, unit):
+        """Returns a unit to the pool, handing it straight to the oldest waiting job if any."""
+        if self._waiting:
+            start, args = self._waiting.popleft()
+            start(unit, *args)
+        else:
+            self._free.append(unit)
+
+    def available_count(self):
+        return len(self._free)
+
+    def waiting_count(self):
+        return len(self._waiting)
+
+    def __len__(self):
+        return len(self.units)
@@ -0,0 +1,63 @@
+# EventScheduler.py
+import heapq
+import itertools
+from SimClock import RealTimeClock
+
+
+class EventScheduler:
+    """
+    Discrete-event core of the simulation: a priority queue of timestamped events.
+    Timed components (Oven, Pan, DeliveryDrone, order generation) schedule a callback
+    for the moment their timer expires instead of polling time.time() every frame,
+    so a tick only touches the components that actually have an event due.
+    """
+
+    def __init__(self, clock=None):
+        self.clock = clock if clock is not None else RealTimeClock()
+        self._events = []  # Heap of [due_time, sequence, callback, args]
+        self._sequence = itertools.count()  # Keeps events due at the same time in FIFO order
+        self.events_processed = 0
+
+    def now(self):
+        return self.clock.now()
+
+    def schedule_at(self, due_time, callback, *args):
+        """Schedules callback(*args) to run at due_time. Returns a handle for cancel()."""
+        event = [due_time, next(self._sequence), callback, args]
+        heapq.heappush(self._events, event)
+        return event
+
+    def schedule(self, delay, callback, *args):
+        """Schedules callback(*args) to run `delay` seconds from now."""
+        return self.schedule_at(self.clock.now() + delay, callback, *args)
+
+    def cancel(self, event):
+        """Cancels a scheduled event (lazily: it is dropped when it reaches the top of the heap)."""
+        event[2] = None
+
+    def next_event_time(self):
+        """Returns the due time of the earliest pending event, or None if nothing is scheduled."""
+        while self._events and self._events[0][2] is None:
+            heapq.heappop(self._events)
+        return self._events[0][0] if self._events else None
+
+    def run_due(self, now=None):
+        """Runs every event that is due. Events scheduled while running are
+        processed in the same pass if they are already due."""
+        if now is None:
+            now = self.clock.now()
+
+        events = self._events
+        processed = 0
+        while events and events[0][0] <= now:
+            _, _, callback, args = heapq.heappop(events)
+            if callback is None:
+                continue  # Cancelled
+            callback(*args)
+            processed += 1
+
+        self.events_processed += processed
+        return processed
+
+    def __len__(self):
+        return len(self._events)
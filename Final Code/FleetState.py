@@ -0,0 +1,92 @@
+# FleetState.py
+import numpy as np
+
+
+class FleetState:
+    """
+    Structure-of-arrays kinematic state for every drone in the fleet. Row i holds
+    drone i's home, current position, leg start/target, leg start time, duration,
+    end time and status code; a DeliveryDrone is only a view over its row.
+    Positions of all moving drones and all finished legs are computed in one
+    vectorized pass per tick instead of one Python call per drone.
+    """
+
+    IDLE, PICKUP, TRAVELING, DROPPING_OFF, RETURNING = range(5)
+    STATUS_NAMES = ("IDLE", "PICKUP", "TRAVELING", "DROPPING OFF", "RETURNING")
+
+    def __init__(self, capacity=16):
+        self.size = 0
+        self.home = np.zeros((capacity, 2))
+        self.position = np.zeros((capacity, 2))
+        self.leg_start = np.zeros((capacity, 2))
+        self.target = np.zeros((capacity, 2))
+        self.start_time = np.zeros(capacity)
+        self.duration = np.zeros(capacity)
+        self.end_time = np.full(capacity, np.inf) # inf while the drone is not flying a leg
+        self.status = np.zeros(capacity, dtype=np.int8)
+
+    def add(self, home_pos):
+        """Adds a drone parked at home_pos and returns its row."""
+        if self.size == len(self.status):
+            self._grow(2 * len(self.status))
+        row = self.size
+        self.size += 1
+        self.home[row] = home_pos
+        self.position[row] = home_pos
+        self.leg_start[row] = home_pos
+        self.target[row] = home_pos
+        self.status[row] = self.IDLE
+        return row
+
+    def _grow(self, capacity):
+        for name in ("home", "position", "leg_start", "target", "start_time", "duration", "status"):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+        end_time = np.full(capacity, np.inf)
+        end_time[:len(self.end_time)] = self.end_time
+        self.end_time = end_time
+
+    def start_leg(self, row, target, now, speed):
+        """Starts a straight flight for row from its current position. Returns the leg's end time."""
+        start = self.position[row]
+        self.leg_start[row] = start
+        self.target[row] = target
+        self.start_time[row] = now
+        self.duration[row] = np.hypot(target[0] - start[0], target[1] - start[1]) / speed
+        self.end_time[row] = now + self.duration[row]
+        return self.end_time[row]
+
+    def next_end_time(self):
+        """Earliest end time of any leg in flight, or None if no drone is flying."""
+        if not self.size:
+            return None
+        end_time = self.end_time[:self.size].min()
+        return float(end_time) if end_time != np.inf else None
+
+    def finish_legs(self, now):
+        """Snaps every drone whose leg has ended to its target. Returns their rows, earliest first."""
+        end_time = self.end_time[:self.size]
+        rows = np.flatnonzero(end_time <= now)
+        if not len(rows):
+            return rows
+        rows = rows[np.argsort(end_time[rows], kind="stable")]
+        self.position[rows] = self.target[rows]
+        self.end_time[rows] = np.inf
+        return rows
+
+    def update_positions(self, now):
+        """Interpolates the position of every drone that is flying a leg."""
+        moving = np.flatnonzero(self.end_time[:self.size] != np.inf)
+        if not len(moving):
+            return
+        duration = self.duration[moving]
+        progress = np.ones_like(duration)
+        flying = duration > 0
+        progress[flying] = np.clip((now - self.start_time[moving][flying]) / duration[flying], 0.0, 1.0)
+        start = self.leg_start[moving]
+        self.position[moving] = start + progress[:, None] * (self.target[moving] - start)
+
+    def __len__(self):
+        return self.size
@@ -1,7 +1,10 @@
 import tkinter as tk
 from tkinter import messagebox, simpledialog
 import socket
-import json
+import threading
+import time
+from OrderProtocol import (UDP_PORT, STREAM_PORT, MAX_DATAGRAM_SIZE, FRAME_HEADER, REJECTED, encode_message,
+                           encode_frame, decode_ack, new_idempotency_key)
 
 # Global variables to track ingredient states
 ingredient_states = {}
@@ -21,8 +24,17 @@ pizza_id_counter = 1000
 pasta_id_counter = 2000
 
 # Network settings - Default to broadcast, but can be changed to specific IP
-TARGET_PORT = 5004
+TARGET_PORT = UDP_PORT
+TARGET_STREAM_PORT = STREAM_PORT  # TCP port for baskets too large for one datagram
 TARGET_IP = "145.93.93.128"  # Default: broadcast to all
+USE_BINARY_FORMAT = True  # Compact binary messages; set to False for kitchens that only read JSON
+stream_sock = None  # Persistent TCP connection to the kitchen, opened on first use
+order_sock = None  # Reusable UDP socket for orders and their acks, opened on first use
+ACK_TIMEOUT = 0.25  # Seconds to wait for a UDP ack before the first resend (doubles per resend)
+STREAM_ACK_TIMEOUT = 2.0  # Seconds to wait for an ack on the TCP connection
+SEND_ATTEMPTS = 5
+SEND_POLL_MS = 50  # How often the Tk loop checks whether a send running in the background has finished
+sending = False  # True while an order is being sent; the network sockets belong to that send until it ends
 
 
 
@@ -230,6 +242,10 @@ def configure_target_ip():
     """Allow user to set specific target IP"""
     global TARGET_IP
 
+    if sending:
+        messagebox.showwarning("Order In Progress", "Please wait until the current order has been sent.")
+        return
+
     new_ip = simpledialog.askstring(
         "Configure Target IP",
         "Enter the kitchen laptop's IP address:",
@@ -238,53 +254,191 @@ def configure_target_ip():
 
     if new_ip:
         TARGET_IP = new_ip
+        close_stream()  # The next large order connects to the new kitchen
         messagebox.showinfo("Success", f"Target IP set to: {TARGET_IP}")
 
 
+def close_stream():
+    """Closes the persistent TCP connection, if any."""
+    global stream_sock
+    if stream_sock:
+        stream_sock.close()
+        stream_sock = None
+
+
+def get_order_socket():
+    """Returns the reusable UDP socket that sends orders and receives their acks."""
+    global order_sock
+    if order_sock is None:
+        order_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        order_sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+    return order_sock
+
+
+class OrderRejectedError(Exception):
+    """The kitchen received the order but refused it (negative ack), so resending cannot help."""
+
+
+def wait_for_ack(sock, receive, key, timeout, transient_errors=()):
+    """Reads acks until the one for key arrives (returns its order id) or timeout passes (returns None).
+    Raises OrderRejectedError if the kitchen rejected the order.
+    Acks for other keys, e.g. late acks of earlier resends, and receive errors listed in
+    transient_errors are skipped."""
+    deadline = time.monotonic() + timeout
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        sock.settimeout(remaining)
+        try:
+            data = receive()
+        except socket.timeout:
+            return None
+        except transient_errors:
+            continue
+        try:
+            acks = decode_ack(data)
+        except ValueError:
+            continue
+        for ack_key, order_id in acks:
+            if ack_key == key:
+                if order_id == REJECTED:
+                    raise OrderRejectedError("The kitchen rejected the order (no valid items)")
+                return order_id
+
+
+def send_datagram(payload, key):
+    """Sends an order over UDP and resends it, with exponential backoff, until the kitchen acks it.
+    Resends carry the same idempotency key, so the kitchen never cooks an order twice."""
+    sock = get_order_socket()
+    timeout = ACK_TIMEOUT
+    for _ in range(SEND_ATTEMPTS):
+        sock.sendto(payload, (TARGET_IP, TARGET_PORT))
+        # Windows reports an earlier datagram to a closed port as ConnectionResetError on the next
+        # recvfrom; that only means the ack has not come (yet), so keep waiting and resending
+        order_id = wait_for_ack(sock, lambda: sock.recvfrom(65535)[0], key, timeout,
+                                transient_errors=(ConnectionResetError,))
+        if order_id is not None:
+            return order_id
+        timeout *= 2
+    raise TimeoutError(f"No acknowledgement from the kitchen after {SEND_ATTEMPTS} attempts")
+
+
+def recv_exact(sock, size):
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Kitchen closed the connection")
+        data += chunk
+    return data
+
+
+def read_frame(sock):
+    (length,) = FRAME_HEADER.unpack(recv_exact(sock, FRAME_HEADER.size))
+    return recv_exact(sock, length)
+
+
+def send_stream(payload, key):
+    """Sends one length-prefixed message over the persistent TCP connection and waits for its ack.
+    On a lost connection or a missing ack it reconnects and resends with the same idempotency key."""
+    global stream_sock
+    frame = encode_frame(payload)
+    for attempt in range(SEND_ATTEMPTS):
+        try:
+            if stream_sock is None:
+                stream_sock = socket.create_connection((TARGET_IP, TARGET_STREAM_PORT), timeout=5)
+                stream_sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            stream_sock.sendall(frame)
+            order_id = wait_for_ack(stream_sock, lambda: read_frame(stream_sock), key, STREAM_ACK_TIMEOUT)
+            if order_id is not None:
+                return order_id
+        except OSError:
+            if attempt == SEND_ATTEMPTS - 1:
+                close_stream()
+                raise
+        close_stream()  # A half-read frame would desync the stream, so start a fresh connection
+    raise TimeoutError(f"No acknowledgement from the kitchen after {SEND_ATTEMPTS} attempts")
+
+
+def deliver(payload, key):
+    """Sends an encoded order over UDP, or over TCP when it is too large for one datagram.
+    Returns (kitchen order id, description of where it went). Blocks until acked, so it runs off the Tk thread."""
+    if TARGET_IP == "255.255.255.255" or len(payload) <= MAX_DATAGRAM_SIZE:
+        order_id = send_datagram(payload, key)
+
+        if TARGET_IP == "255.255.255.255":
+            return order_id, f"Order broadcasted to all devices on port {TARGET_PORT}!"
+        return order_id, f"Order sent to {TARGET_IP}:{TARGET_PORT}!"
+    # Large basket: one framed message over TCP instead of a datagram that could be truncated
+    order_id = send_stream(payload, key)
+    return order_id, f"Order sent to {TARGET_IP}:{TARGET_STREAM_PORT} (TCP)!"
+
+
 def send_order():
-    """Send order to target IP (specific or broadcast)"""
+    """Send order to target IP (specific or broadcast) and wait until the kitchen acknowledges it.
+    Sending and resending happen on a background thread; the Tk loop polls for the outcome,
+    so the app stays responsive while it waits for the ack."""
+    global sending
     if not basket:
         messagebox.showwarning("Empty Basket", "Your basket is empty. Please add items before sending.")
         return
+    if sending:
+        messagebox.showwarning("Order In Progress", "Please wait until the current order has been sent.")
+        return
 
     # Format the order data
     formatted_orders = format_order_data()
+    sent_count = len(basket)
 
     try:
-        # Create UDP socket
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-
-        # If using broadcast address, enable broadcast option
-        if TARGET_IP == "255.255.255.255":
-            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-
-        # Prepare data to send
+        # Prepare data to send; the key identifies this basket across resends
+        key = new_idempotency_key()
         data_to_send = {
             "orders": formatted_orders,
-            "total_items": len(basket),
+            "key": key,
+            "total_items": sent_count,
             "source": "FoodOrderingApp"
         }
+        payload = encode_message(data_to_send, binary=USE_BINARY_FORMAT)
+    except Exception as e:
+        messagebox.showerror("Send Error", f"Failed to send order: {str(e)}\n\nTarget: {TARGET_IP}:{TARGET_PORT}")
+        return
 
-        # Convert to JSON and send
-        json_data = json.dumps(data_to_send)
-        sock.sendto(json_data.encode('utf-8'), (TARGET_IP, TARGET_PORT))
-        sock.close()
-
-        if TARGET_IP == "255.255.255.255":
-            message = f"Order broadcasted to all devices on port {TARGET_PORT}!"
-        else:
-            message = f"Order sent to {TARGET_IP}:{TARGET_PORT}!"
-
-        messagebox.showinfo("Success", f"{message}\n\nOrder data:\n{formatted_orders}")
-
-        # Clear basket after successful payment
-        basket.clear()
+    outcome = []  # Filled by the sending thread: [(order_id, message)] or [exception]
+
+    def run():
+        try:
+            outcome.append(deliver(payload, key))
+        except Exception as e:
+            outcome.append(e)
+
+    def check_sent():
+        global sending
+        if not outcome:
+            root.after(SEND_POLL_MS, check_sent)
+            return
+        sending = False
+        result = outcome[0]
+        if isinstance(result, OrderRejectedError):
+            messagebox.showerror("Order Rejected", f"{result}\n\nOrder data:\n{formatted_orders}")
+            return
+        if isinstance(result, Exception):
+            messagebox.showerror("Send Error", f"Failed to send order: {str(result)}\n\nTarget: {TARGET_IP}:{TARGET_PORT}")
+            return
+
+        order_id, message = result
+        messagebox.showinfo("Success", f"{message}\nKitchen order number: {order_id}\n\nOrder data:\n{formatted_orders}")
+
+        # Remove the sent items after successful payment (items added while sending stay in the basket)
+        del basket[:sent_count]
 
         # Return to main screen
         create_main_screen()
 
-    except Exception as e:
-        messagebox.showerror("Send Error", f"Failed to send order: {str(e)}\n\nTarget: {TARGET_IP}:{TARGET_PORT}")
+    sending = True
+    threading.Thread(target=run, daemon=True).start()
+    root.after(SEND_POLL_MS, check_sent)
 
 
 def process_payment():
@@ -815,14 +969,15 @@ def create_main_screen():
     pasta_button.pack(pady=15)
 
 
-# Create main window
-root = tk.Tk()
-root.title("Food Ordering App")
-root.geometry("500x800")
-root.configure(bg='white')
+if __name__ == "__main__":
+    # Create main window
+    root = tk.Tk()
+    root.title("Food Ordering App")
+    root.geometry("500x800")
+    root.configure(bg='white')
 
-# Start with main screen
-create_main_screen()
+    # Start with main screen
+    create_main_screen()
 
-# Start the application
-root.mainloop()
\ No newline at end of file
+    # Start the application
+    root.mainloop()
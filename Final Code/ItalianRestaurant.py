@@ -1,8 +1,9 @@
 # ItalianRestaurant.py
 
 from enum import Enum
-import time
 import random
+from OrderQueue import OrderQueue
+from EquipmentPool import EquipmentPool
 
 # Define the states from the State Diagram
 class StoreState(Enum):
@@ -15,38 +16,46 @@ class StoreState(Enum):
     DELIVERING = "DELIVERING"
 
 class ItalianRestaurant:
-    def __init__(self, name, address, system_reference):
+    def __init__(self, name, address, system_reference, scheduler, clock):
         self.Name = name
         self.Address = address
-        self.state: StoreState = StoreState.CLOSED
+        self.state: StoreState = StoreState.CLOSED # Summary state for display (stage of the oldest in-flight order)
         self.Chefs = []
         self.Ovens = []
         self.Pans = []
-        self.DeliveryDrivers = []
-        self.Orders = []  # Incoming order queue (like a job queue)
-        self.current_order = None # The order currently being processed/cooked/packaged
+        self.OvenPool = EquipmentPool("Oven") # Free-list + wait queue over self.Ovens
+        self.PanPool = EquipmentPool("Pan")   # Free-list + wait queue over self.Pans
+        self.Orders = OrderQueue()  # Incoming order queue (like a job queue), indexed by order_id
         self.products_ready = [] # Temporary storage for completed items (Pizza/Pasta)
         self.orders_completed_count = 0
         self.completed_orders = []
         self.is_open = False # For City_AI display
-        
+
         # Reference to the main system for callbacks
-        self.system_reference = system_reference 
-        self.items_to_package = {} # Tracks items ready for packaging for the current order
-        self.delivery_in_progress_order = None # Order data currently out for delivery
+        self.system_reference = system_reference
+        self.registry = system_reference.order_registry # System-wide active-order status records
+
+        # --- Pipelined kitchen: many orders in flight, each with its own stage ---
+        self.in_flight_orders = {} # order_id -> {'data': Order, 'stage': StoreState, 'chef': Chef}
+        self.awaiting_drone = set() # Packaged order ids waiting for the city-wide fleet to send a drone
+        self.stage_counts = {} # StoreState -> number of in-flight orders in that stage
 
+        # Event-driven processing: the restaurant only runs update() when something changed
+        self.scheduler = scheduler
+        self.clock = clock # Simulation clock (real, scaled or virtual)
+        self.update_pending = False
+        self.packaging_time = 0.01 # seconds
 
     def add_chef(self, chef):
         self.Chefs.append(chef)
 
     def add_oven(self, oven):
         self.Ovens.append(oven)
+        self.OvenPool.add(oven)
 
     def add_pan(self, pan):
         self.Pans.append(pan)
-
-    def add_delivery_driver(self, driver):
-        self.DeliveryDrivers.append(driver)
+        self.PanPool.add(pan)
 
     def get_current_state(self):
         """Returns the current state for visualization."""
@@ -57,181 +66,160 @@ class ItalianRestaurant:
         self.is_open = True
         print(f"[{self.Name}] is now {self.state.value}.")
 
-    def receive_order(self, order_data):
-        """Receives a new order from a Customer/System (Sequence Diagram)."""
-        self.Orders.append(order_data)
-        print(f"[{self.Name}] Received new order {order_data['order_id']} from {order_data['customer_id']}. Queue size: {len(self.Orders)}")
-        
-        # Transition: OPEN -> PREPARING (if an order is received and queue was empty)
-        if self.state == StoreState.OPEN and len(self.Orders) == 1:
-             self.state = StoreState.PREPARING
-             print(f"[{self.Name}] Transition: OPEN -> PREPARING.")
+    def receive_order(self, order):
+        """Receives a new Order from a Customer/System (Sequence Diagram)."""
+        order.Restaurant = self
+        order.freeze() # Items are fixed from here on; the order total can be cached
+        self.Orders.append(order)
+        print(f"[{self.Name}] Received new order {order.OrderID} from {order.CustomerID}. Queue size: {len(self.Orders)}")
+        self.registry.order_received(self.Name, order)
+        self.request_update()
+
+    def request_update(self):
+        """Schedules a single update() for the current tick (no-op if one is already pending)."""
+        if not self.update_pending:
+            self.update_pending = True
+            self.scheduler.schedule(0, self.update)
 
     # --- Core Order Processing Logic ---
-    
-    def _start_preparation(self):
-        """Transition: PREPARING -> COOKING/BAKING. Chef starts working."""
-        if not self.Orders:
-            self.state = StoreState.OPEN
-            print(f"[{self.Name}] Transition: PREPARING -> OPEN (Queue empty).")
-            return
 
-        # Take the next order from the queue
-        self.current_order = self.Orders.pop(0)
-        order_id = self.current_order['order_id']
-        
-        # Initialize items_to_package tracker for this order
-        self.items_to_package[order_id] = {}
-        for item in self.current_order['items']:
-            item_id = item[0]
-            item_type = item[1]
-            # Store the item data initially, mark it as not ready
-            self.items_to_package[order_id][item_id] = {'data': item, 'ready': False, 'type': item_type}
-
-        # Find an available chef
-        available_chef = next((c for c in self.Chefs if c.ChefAvailable), None)
-
-        if available_chef:
-            # Chef handles dispatching all items to Oven/Pan
-            available_chef.prepare_order(self, self.current_order)
-            self.state = StoreState.COOKING # Change state to indicate active cooking/baking
-            print(f"[{self.Name}] Transition: PREPARING -> COOKING/BAKING. Chef {available_chef.Name} started order {order_id}.")
+    def _set_stage(self, order_id, stage: StoreState):
+        """Moves one in-flight order to a new stage of the pipeline."""
+        record = self.in_flight_orders[order_id]
+        print(f"[{self.Name}] Order {order_id}: {record['stage'].value} -> {stage.value}.")
+        self.stage_counts[record['stage']] -= 1
+        self.stage_counts[stage] = self.stage_counts.get(stage, 0) + 1
+        record['stage'] = stage
+        self.registry.order_stage(order_id, stage.value)
+
+    def _refresh_state(self):
+        """Updates the summary state shown on the map."""
+        if self.in_flight_orders:
+            oldest = next(iter(self.in_flight_orders.values()))
+            new_state = oldest['stage']
+        elif self.Orders:
+            new_state = StoreState.PREPARING
         else:
-            # Re-queue the order if no chef is available (simplified)
-            self.Orders.insert(0, self.current_order)
-            self.current_order = None
-            print(f"[{self.Name}] Warning: No available chef. Order {order_id} re-queued.")
+            new_state = StoreState.OPEN
+
+        if new_state != self.state:
+            print(f"[{self.Name}] Transition: {self.state.value} -> {new_state.value}.")
+            self.state = new_state
+
+    def _start_preparation(self, chef):
+        """Transition: PREPARING -> COOKING/BAKING. Takes the next queued order and hands it to a free chef."""
+        order = self.Orders.popleft()
+        order_id = order.OrderID
 
-    def notify_cooking_status(self, item_id, status: str, item_type: str):
+        self.in_flight_orders[order_id] = {'data': order, 'stage': StoreState.PREPARING, 'chef': chef}
+        self.stage_counts[StoreState.PREPARING] = self.stage_counts.get(StoreState.PREPARING, 0) + 1
+
+        # Chef handles dispatching all items to Oven/Pan; each item reports back through notify_cooking_status
+        chef.prepare_order(self, order)
+        self._set_stage(order_id, StoreState.COOKING)
+        print(f"[{self.Name}] Chef {chef.Name} started order {order_id}. In flight: {len(self.in_flight_orders)}")
+
+    def notify_cooking_status(self, item, status: str, order):
         """
-        Receives cooking/baking completion status from Chef/Equipment.
-        Transition: COOKING/BAKING -> PACKAGING (when all items are ready).
+        Receives cooking/baking completion status of one item of `order` from Chef/Equipment.
+        Transition: COOKING/BAKING -> PACKAGING (when all items of that order are ready).
         """
-        order_id = self.current_order['order_id']
-        
-        if order_id not in self.items_to_package:
-            print(f"[{self.Name}] Error: Received status for item {item_id} but order {order_id} is not tracked.")
+        order_id = order.OrderID
+        if order_id not in self.in_flight_orders:
+            print(f"[{self.Name}] Error: Received status for item {item.ItemID} but order {order_id} is not tracked.")
             return
-            
+
         if status == 'done':
             # Mark the item as ready
-            if item_id in self.items_to_package[order_id]:
-                self.items_to_package[order_id][item_id]['ready'] = True
-                print(f"[{self.Name}] Item {item_id} ({item_type}) ready for order {order_id}.")
-            else:
-                print(f"[{self.Name}] Error: Unknown item ID {item_id} for order {order_id}.")
+            order.ItemsReady += 1
+            self.registry.item_ready(order_id)
+            print(f"[{self.Name}] Item {item.ItemID} ({item.Type}) ready for order {order_id}.")
 
-        # Check if ALL items in the current order are ready
-        all_items_ready = all(item['ready'] for item in self.items_to_package[order_id].values())
-
-        if all_items_ready:
+        # Check if ALL items in this order are ready
+        if order.AllItemsReady():
             print(f"[{self.Name}] All items for order {order_id} are ready. Starting packaging.")
-            self.state = StoreState.PACKAGING
-            
-    def _start_packaging(self):
+            record = self.in_flight_orders[order_id]
+            record['chef'].finish_order()
+            record['chef'] = None
+            self._set_stage(order_id, StoreState.PACKAGING)
+            self._start_packaging(order_id)
+            self.request_update() # The chef is free for the next queued order
+
+    def _start_packaging(self, order_id):
         """Simulate packaging time."""
-        if self.state != StoreState.PACKAGING:
-            return
-
-        # Simple packaging simulation: Instantaneous (or could use a timer)
-        time.sleep(0.01) # Small delay for simulation effect
-
-        print(f"[{self.Name}] Order {self.current_order['order_id']} is packaged. Starting delivery.")
-        self.state = StoreState.DELIVERING
-        self._start_delivery()
+        # Simple packaging simulation: a short timer instead of blocking the loop
+        self.scheduler.schedule(self.packaging_time, self._finish_packaging, order_id)
+
+    def _finish_packaging(self, order_id):
+        """Packaging-done event."""
+        print(f"[{self.Name}] Order {order_id} is packaged. Requesting a drone.")
+        self.awaiting_drone.add(order_id)
+        self.system_reference.fleet.request_drone(self, order_id)
+
+    def start_delivery(self, order_id, drone):
+        """Transition: PACKAGING -> DELIVERING. Called by the DroneFleet with the drone it assigned."""
+        self.awaiting_drone.discard(order_id)
+        order = self.in_flight_orders[order_id]['data']
+
+        # Find the customer object to get coordinates using the system reference
+        customer = self.system_reference.active_customer_orders.get(order_id)
+        if customer:
+            customer_x, customer_y = customer.x, customer.y
+        else:
+            # Fallback: Should not happen if tracking is correct, but safe fallback is necessary
+            print(f"[{self.Name}] Warning: Could not find customer coords in system tracking. Using random house.")
+            house_index = random.randint(0, len(self.system_reference.city.houseCoords) - 1)
+            customer_x, customer_y = self.system_reference.city.houseCoords[house_index]
 
+        # Drone starts delivery
+        if drone.deliver_order(self, order, customer_x, customer_y):
+            self._set_stage(order_id, StoreState.DELIVERING)
+            print(f"[{self.Name}] Delivery started for order {order_id}.")
+            return True
 
-    def _start_delivery(self):
-        """Transition: PACKAGING -> DELIVERING. Drone starts delivery."""
-        if self.state != StoreState.DELIVERING or not self.current_order:
-            return
+        print(f"[{self.Name}] Error: Drone {drone.DroneID} refused order {order_id}.")
+        return False
 
-        available_drone = next((d for d in self.DeliveryDrivers if d.Available), None)
-
-        if available_drone:
-            # Find the customer object to get coordinates using the system reference
-            customer = self.system_reference.active_customer_orders.get(self.current_order['order_id'])
-            if customer:
-                customer_x, customer_y = customer.x, customer.y
-            else:
-                # Fallback: Should not happen if tracking is correct, but safe fallback is necessary
-                print(f"[{self.Name}] Warning: Could not find customer coords in system tracking. Using random house.")
-                house_index = random.randint(0, len(self.system_reference.city.houseCoords) - 1)
-                customer_x, customer_y = self.system_reference.city.houseCoords[house_index]
-
-            # Drone starts delivery
-            delivery_successful = available_drone.deliver_order(
-                self, 
-                self.current_order, 
-                customer_x, 
-                customer_y
-            )
-
-            if delivery_successful:
-                self.delivery_in_progress_order = self.current_order
-                self.current_order = None # Order is now with the drone
-                # Clear item tracking for the packaged order
-                del self.items_to_package[self.delivery_in_progress_order['order_id']]
-                print(f"[{self.Name}] Delivery started for order {self.delivery_in_progress_order['order_id']}.")
-            else:
-                # Should not happen if state is handled correctly
-                print(f"[{self.Name}] Error: No available drone despite state DELIVERING.")
-                
-        else:
-            # Should enter PACKAGING state and wait for drone
-            print(f"[{self.Name}] Waiting for available drone.")
-            self.state = StoreState.PACKAGING # Go back to packaging state to wait for drone
-
-    def complete_order(self, completed_order):
-        """Called by DeliveryDrone when delivery is finished (Sequence Diagram)."""
-        if not self.delivery_in_progress_order or completed_order['order_id'] != self.delivery_in_progress_order['order_id']:
-            print(f"[{self.Name}] Warning: complete_order called but order {completed_order['order_id']} was not marked as delivering.")
+    def complete_order(self, order):
+        """Called by DeliveryDrone when an order has been successfully delivered."""
+        order_id = order.OrderID
+        if order_id not in self.in_flight_orders:
+            print(f"[{self.Name}] Warning: complete_order called but order {order_id} was not marked as delivering.")
             return
 
-        self.delivery_in_progress_order = None
+        # 1. Update Restaurant State & Counters
         self.orders_completed_count += 1
+        record = self.in_flight_orders.pop(order_id)
+        self.stage_counts[record['stage']] -= 1
 
-        # Notify the AutomatedRestaurantSystem that the order is done.
-        self.system_reference.handle_completed_order(completed_order)
-        
-        # State transitions
-        if self.Orders:
-            self.state = StoreState.PREPARING
-            print(f"[{self.Name}] Transition: DELIVERING -> PREPARING (More orders waiting).")
-        elif self.current_order:
-            # If the next order's preparation was very fast, it might be waiting for packaging
-            next_order_id = self.current_order['order_id']
-            if next_order_id in self.items_to_package and all(item['ready'] for item in self.items_to_package.get(next_order_id, {}).values()):
-                self.state = StoreState.PACKAGING
-            else:
-                self.state = StoreState.COOKING 
-            print(f"[{self.Name}] Transition: DELIVERING -> {self.state.value} (Next order in progress).")
-        else:
-            self.state = StoreState.OPEN
-            print(f"[{self.Name}] Transition: DELIVERING -> OPEN (Queue empty).")
+        # 2. Store as completed order (History)
+        order.set_status('DELIVERED')
+        order.CompletionTime = self.clock.now() # Add timestamp (simulated time)
+        self.completed_orders.append(order)
+
+        # 3. Notify system (removes from active list)
+        self.system_reference.handle_completed_order(order)
+        self.registry.order_delivered(order_id)
+
+        # 4. Refresh the summary state in update()
+        print(f"[{self.Name}] Order {order_id} DELIVERED. In flight: {len(self.in_flight_orders)}")
+        self.request_update()
 
     # --- Update Loop ---
 
     def update(self):
-        """Performs state-based actions and updates all equipment."""
-        
-        # 1. Update Equipment
-        for oven in self.Ovens:
-            oven.update(self)
-        for pan in self.Pans:
-            pan.update(self)
-        for drone in self.DeliveryDrivers:
-            drone.update(self)
-            
-        # 2. Perform State Actions
-        if self.state == StoreState.PREPARING:
-            self._start_preparation()
-        elif self.state == StoreState.PACKAGING:
-            self._start_packaging()
-        elif self.state == StoreState.OPEN and self.Orders:
-            # If a new order arrived while OPEN, transition to PREPARING
-            self.state = StoreState.PREPARING
-            print(f"[{self.Name}] Transition: OPEN -> PREPARING (New order detected in queue).")
+        """Moves the pipeline forward. Scheduled through request_update() whenever
+        something changed; equipment timers are handled by their own events."""
+        self.update_pending = False
+
+        # Start as many queued orders as there are free chefs (drones come from the DroneFleet)
+        while self.Orders:
+            chef = next((c for c in self.Chefs if c.ChefAvailable), None)
+            if not chef:
+                break
+            self._start_preparation(chef)
+
+        self._refresh_state()
 
     # --- Utility Methods ---
     def check_and_clear_completed_orders(self):
@@ -241,85 +229,39 @@ class ItalianRestaurant:
         return count
 
     def get_active_orders_status(self):
-        """Returns a list of status dictionaries for active orders in this restaurant."""
-        status_list = []
-        added_order_ids = set()
-        
-        # 1. Add current order details
-        if self.current_order and self.current_order['order_id'] not in added_order_ids:
-            order_id = self.current_order['order_id']
-            order_data = {
-                'restaurant_name': self.Name, # NEW: Include restaurant name
-                'order_id': order_id,
-                'state': self.state.value, 
-                'items_total': self.current_order['total_items'],
-                'items_ready': len(self.products_ready) if hasattr(self, 'products_ready') else 0
-            }
-            status_list.append(order_data)
-            added_order_ids.add(order_id)
-        
-        # 2. Add orders waiting in the queue (FIFO)
-        for order in self.Orders:
-            order_id = order['order_id']
-            if order_id not in added_order_ids:
-                order_data = {
-                    'restaurant_name': self.Name, # NEW: Include restaurant name
-                    'order_id': order_id,
-                    'state': 'QUEUED',
-                    'items_total': order['total_items'],
-                    'items_ready': 0 
-                }
-                status_list.append(order_data)
-                added_order_ids.add(order_id)
-
-        return status_list
-
+        """Returns a list of status dictionaries for active orders in this restaurant (from the OrderRegistry)."""
+        return self.registry.restaurant_orders(self.Name)
 
     def get_restaurant_stats(self):
         return {
             'orders_done': self.orders_completed_count,
             'available_chefs': sum(1 for c in self.Chefs if c.ChefAvailable),
             'total_chefs': len(self.Chefs),
-            'available_ovens': sum(1 for o in self.Ovens if o.Available),
-            'total_ovens': len(self.Ovens),
-            'available_pans': sum(1 for p in self.Pans if p.Available),
-            'total_pans': len(self.Pans),
+            'available_ovens': self.OvenPool.available_count(),
+            'total_ovens': len(self.OvenPool),
+            'waiting_pizzas': self.OvenPool.waiting_count(),
+            'available_pans': self.PanPool.available_count(),
+            'total_pans': len(self.PanPool),
+            'waiting_pastas': self.PanPool.waiting_count(),
             'state': self.state.value,
-            'queue_size': len(self.Orders)
+            'queue_size': len(self.Orders),
+            'in_flight': len(self.in_flight_orders),
+            'delivering': self.stage_counts.get(StoreState.DELIVERING, 0),
+            'awaiting_drone': len(self.awaiting_drone),
+            'available_drones': self.system_reference.fleet.idle_count(), # City-wide fleet
+            'total_drones': len(self.system_reference.fleet.drones)
         }
-    
+
     def get_drone_states(self):
-        """Returns a list of status strings for all delivery drones."""
-        # Assuming self.DeliveryDrivers holds the drone objects
+        """Returns a list of status strings for the drones carrying this restaurant's orders."""
         drone_states = []
-        for drone in self.DeliveryDrivers:
+        for drone in self.system_reference.fleet.drones:
+            if drone.delivery_restaurant is not self:
+                continue
             # Format: "Drone X: IDLE" or "Drone Y: TRAVELING (Order Z)"
             status_text = f"Drone {drone.DroneID}: {drone.Status}"
             drone_states.append(status_text)
         return drone_states
-    
-    def complete_order(self, order_data):
-        """Called by DeliveryDrone when an order has been successfully delivered."""
-        order_id = order_data['order_id']
-        
-        # 1. Update Restaurant State & Counters
-        self.orders_completed_count += 1
-        self.delivery_in_progress_order = None
-        
-        # 2. Store as completed order (History)
-        order_data['final_status'] = 'DELIVERED'
-        order_data['completion_time'] = time.time() # Add timestamp
-        self.completed_orders.append(order_data)
-        
-        # 3. Notify system (removes from active list)
-        self.system_reference.handle_completed_order(order_data)
-        
-        # 4. Transition back to PREPARING or OPEN
-        if self.Orders:
-            self.state = StoreState.PREPARING
-        else:
-            self.state = StoreState.OPEN
-        print(f"[{self.Name}] Order {order_id} DELIVERED. Transition: DELIVERING -> {self.state.value}")
 
     # --- NEW METHOD: Get all orders (for detailed view) ---
     def get_all_order_data(self):
@@ -328,58 +270,30 @@ class ItalianRestaurant:
         and returns a unified list for display in the UI.
         """
         all_orders = []
-        
-        # 1. Queued Orders (in self.Orders)
-        for order in self.Orders:
+
+        # 1. Active orders (queued, cooking, packaging or out for delivery), from the OrderRegistry
+        for order in self.registry.restaurant_orders(self.Name):
             all_orders.append({
                 'type': 'ACTIVE',
                 'order_id': order['order_id'],
                 'customer_id': order['customer_id'],
-                'state': 'QUEUED',
-                'items_total': len(order['items']),
-                'items_ready': 0,
-                'is_current': False
-            })
-            
-        # 2. Currently Processing Order (in self.current_order)
-        if self.current_order:
-            order_id = self.current_order['order_id']
-            # Calculate items ready (from items_to_package)
-            ready_count = sum(1 for item in self.items_to_package.get(order_id, {}).values() if item['ready'])
-            
-            all_orders.append({
-                'type': 'ACTIVE',
-                'order_id': order_id,
-                'customer_id': self.current_order['customer_id'],
-                'state': self.state.value, # PREPARING, COOKING, BAKING, PACKAGING
-                'items_total': len(self.current_order['items']),
-                'items_ready': ready_count,
-                'is_current': True,
-            })
-
-        # 3. Order out for delivery (in self.delivery_in_progress_order)
-        if self.delivery_in_progress_order:
-             all_orders.append({
-                'type': 'ACTIVE',
-                'order_id': self.delivery_in_progress_order['order_id'],
-                'customer_id': self.delivery_in_progress_order['customer_id'],
-                'state': 'DELIVERING',
-                'items_total': len(self.delivery_in_progress_order['items']),
-                'items_ready': len(self.delivery_in_progress_order['items']), 
-                'is_current': False
+                'state': order['state'],
+                'items_total': order['items_total'],
+                'items_ready': order['items_ready'],
+                'is_current': order['state'] not in ('QUEUED', 'DELIVERING'),
             })
 
-        # 4. Completed Orders (in self.completed_orders)
+        # 2. Completed Orders (in self.completed_orders)
         for order in self.completed_orders:
             all_orders.append({
                 'type': 'COMPLETED',
-                'order_id': order['order_id'],
-                'customer_id': order['customer_id'],
-                'state': order.get('final_status', 'DELIVERED'),
-                'items_total': len(order['items']),
-                'items_ready': len(order['items']),
+                'order_id': order.OrderID,
+                'customer_id': order.CustomerID,
+                'state': order.Status,
+                'items_total': len(order.Products),
+                'items_ready': order.ItemsReady,
                 'is_current': False,
-                'completion_time': order.get('completion_time', 'N/A')
+                'completion_time': order.CompletionTime
             })
-            
-        return all_orders
\ No newline at end of file
+
+        return all_orders
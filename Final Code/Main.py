@@ -1,118 +1,181 @@
-import pygame
 import time
 import random
 import sys
-import math
-import socket
-import json
-import threading
+import argparse
+import itertools
 from City import City, houseCoords, RESTAURANT_POSITIONS
 from Customer import Customer
+from Order import Order, create_products
+from MenuCatalog import get_catalog
 from DeliveryDrone import DeliveryDrone
+from DroneFleet import DroneFleet
 from ItalianRestaurant import ItalianRestaurant
 from Chef import Chef
 from Oven import Oven
 from Pan import Pan
-from UI import TkinterThread  # NEW: Import the threading class for the UI
-
-# Re-initialize pygame and constants
-pygame.init()
+from EventScheduler import EventScheduler
+from SimClock import VirtualClock, create_clock
+from RoutingPolicy import create_routing_policy, ROUTING_POLICIES
+from OrderIngestServer import OrderIngestServer
+from OrderHandoff import OrderHandoff
+from OrderRegistry import OrderRegistry
+from TextCache import TextCache
+from AssetManager import AssetManager
+from OrderProtocol import UDP_PORT, STREAM_PORT
+
+try:
+    import pygame
+except ImportError:  # Headless servers run the simulation without pygame
+    pygame = None
+
+# Display constants (the pygame objects are only created by init_display)
 SCREEN_WIDTH = 1200
 SCREEN_HEIGHT = 720
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Automated Restaurant Delivery Simulation")
-font_large = pygame.font.Font(None, 36)
-font_medium = pygame.font.Font(None, 24)
-font_small = pygame.font.Font(None, 18)
-clock = pygame.time.Clock()
+screen = None
+font_large = None
+font_medium = None
+font_small = None
+text_cache = None
+assets = None
+clock = None
+
+
+def init_display():
+    """Initializes pygame, the window and the fonts used by the visual mode."""
+    global screen, font_large, font_medium, font_small, text_cache, assets, clock
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Automated Restaurant Delivery Simulation")
+    font_large = pygame.font.Font(None, 36)
+    font_medium = pygame.font.Font(None, 24)
+    font_small = pygame.font.Font(None, 18)
+    text_cache = TextCache() # Every label drawn on the map goes through this cache
+    assets = AssetManager()   # Images are loaded (or read pre-scaled from the disk cache) on the first draw
+    clock = pygame.time.Clock()
+    return screen
 
 
 class AutomatedRestaurantSystem:
-    def __init__(self, screen):
+    def __init__(self, screen=None, headless=False, order_interval=5, clock=None, listen=True, routing="nearest",
+                 status_rate=10, sim_rate=30, fps=30,
+                 fleet_size=None, recv_buffer_size=4 * 1024 * 1024, intake_limit=10000, stream_port=STREAM_PORT):
         self.screen = screen
+        self.headless = headless
         self.is_running = True
-        self.current_time = time.time()
+
+        # Simulation clock shared by every timed component (real, scaled or virtual)
+        self.clock = clock if clock is not None else create_clock("real")
+        self.current_time = self.clock.now()
         self.last_order_time = self.current_time
-        self.order_interval = 5
+        self.order_interval = order_interval
         self.orders_processed = 0
+        self.sim_rate = sim_rate # Simulation steps per wall-clock second in the visual mode
+        self.fps = fps           # Render frame cap in the visual mode
+        self.max_frame_lag = 0.25 # Wall-clock seconds of simulation the loop catches up on after a slow frame
+        self.max_idle_wait = 0.5  # Longest headless sleep between events, so Ctrl+C and is_running stay responsive
+        self.sim_steps = 0
+        self.frames = 0
         self.restaurants = []
         self.drones = []
+        self.fleet = None
+        self.fleet_size = fleet_size # Number of drones in the shared fleet (default: one per restaurant)
         self.restaurant_positions = RESTAURANT_POSITIONS
         self.customers = []
         self.active_customer_orders = {}
         self.customer_map = {}
         self.city = None
-
-        self.listener_port = 5004
-        self.next_manual_order_id = 9000
+        self._drawn_background = None # Background surface currently on screen (None: full redraw needed)
+        self._dirty_rects = []        # Screen rects drawn by the dynamic layers in the last frame
+        # Active-order status records, updated by the restaurants on every lifecycle transition.
+        # Changes are only tracked for the status UI, which is not started in headless mode.
+        self.order_registry = OrderRegistry(track_changes=not headless)
+
+        # Order routing policy ('nearest' or 'predicted') and end-to-end latency tracking
+        self.routing_policy = create_routing_policy(routing)
+        self.order_placed_times = {} # order_id -> simulated time the order was placed
+        self.total_delivery_latency = 0.0
+        self.max_delivery_latency = 0.0
+
+        # Discrete-event core: every timer in the simulation is an event in this queue
+        self.scheduler = EventScheduler(self.clock)
+
+        self.listener_port = UDP_PORT
+        self.stream_port = stream_port # TCP port for large and batched orders (None: UDP only)
+        self.recv_buffer_size = recv_buffer_size # SO_RCVBUF requested for the order socket
+        self.intake_limit = intake_limit # Datagrams the ingestion server buffers before dropping
+        self.order_server = None
+        self.order_handoff = OrderHandoff() # Listener thread -> main loop, drained once per tick
+        self.order_ids = itertools.count(9000) # next() is atomic, so the listener thread can allocate ids too
         self.mock_customer_id = "EXT_CUST_NET"
 
-        # ---  UI Thread Setup ---
-        self.tkinter_thread = TkinterThread(self)
-        self.tkinter_thread.start()
-        # Wait briefly for the thread to initialize the UI objects
-        while not self.tkinter_thread.status_ui:
-            time.sleep(0.05)
-        self.status_ui = self.tkinter_thread.status_ui
+        # ---  UI Thread Setup (skipped in headless mode) ---
+        self.tkinter_thread = None
+        self.status_ui = None
+        if not headless:
+            from UI import TkinterThread  # Tk is only needed when a display is available
+            self.tkinter_thread = TkinterThread(self, max_publish_rate=status_rate)
+            self.tkinter_thread.start() # Tk builds its windows while setup_system() runs below
         # ----------------------------
 
         self.setup_system()
-        self._start_order_listener()
+        if self.tkinter_thread:
+            self.tkinter_thread.ready.wait()
+            self.status_ui = self.tkinter_thread.status_ui
+            if not self.tkinter_thread.is_running():
+                print("[SYSTEM] Order status window unavailable; not tracking status changes.")
+                self.order_registry.stop_tracking()
+        self.scheduler.schedule_at(self.last_order_time + self.order_interval, self._generate_and_place_order)
+        if listen:
+            self._start_order_listener()
 
-        # --- UDP Listener methods (_start_order_listener, _listen_for_orders, submit_external_order) remain the same ---
 
     def _start_order_listener(self):
-        """Initializes and starts the UDP listener thread."""
-        self.listener_thread = threading.Thread(target=self._listen_for_orders, daemon=True)
-        self.listener_thread.start()
-
-    def _listen_for_orders(self):
-        """Listens for orders from an external ordering app via UDP."""
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        try:
-            sock.bind(('', self.listener_port))
-            print("=" * 50)
-            print(f"📡 KITCHEN ORDER RECEIVER 📡")
-            print(f"Listening for external orders on port {self.listener_port}...")
-            print("=" * 50)
-        except OSError as e:
-            print(f"FATAL: Could not bind to port {self.listener_port}. Is it already in use? Error: {e}")
+        """Starts the asyncio UDP ingestion server on its own thread."""
+        self.order_server = OrderIngestServer(self.accept_external_order, port=self.listener_port,
+                                              stream_port=self.stream_port,
+                                              recv_buffer_size=self.recv_buffer_size,
+                                              max_pending=self.intake_limit)
+        if not self.order_server.start():
             self.is_running = False
-            return
 
-        while self.is_running:
-            try:
-                sock.settimeout(0.1)
-                data, addr = sock.recvfrom(4096)
-                order_data_raw = json.loads(data.decode('utf-8'))
-
-                if "orders" in order_data_raw:
-                    self.submit_external_order(order_data_raw.get("orders", []))
-                else:
-                    print(f"Warning: Received order from {addr} but missing 'orders' key. Payload: {order_data_raw}")
-
-            except socket.timeout:
-                continue
-            except json.JSONDecodeError:
-                print(f"Error: Received malformed JSON from {addr}.")
-            except Exception as e:
-                if self.is_running:
-                    print(f"Error in order listener: {e}")
-                else:
-                    break
-
-        print("Listener thread shut down.")
-
-    def submit_external_order(self, external_items):
-        """Processes and submits an order received from the external network source,
-        assigning it to a random customer address."""
+    def _stop_order_listener(self):
+        if self.order_server:
+            self.order_server.stop()
 
+    def accept_external_order(self, external_items):
+        """Runs on the listener thread: validates an order, converts its items to Pizza/Pasta
+        objects, gives it an id and hands it to the main loop without touching any simulation
+        state. Returns the order id, or None if rejected."""
         if not external_items:
             print("[SYSTEM] External order rejected: No items provided.")
-            return
+            return None
+        try:
+            products = create_products(external_items)
+        except ValueError as e:
+            print(f"[SYSTEM] External order rejected: {e}")
+            return None
+
+        order_id = self._allocate_order_id()
+        self.order_handoff.push(order_id, products)
+        return order_id
+
+    def _drain_external_orders(self):
+        """Submits every order the listener handed off since the last tick (main loop only)."""
+        for order_id, products in self.order_handoff.drain():
+            self.submit_external_order(products, order_id)
+
+    def submit_external_order(self, products, order_id=None):
+        """Processes and submits an order received from the external network source (its items
+        already converted by create_products), assigning it to a random customer address.
+        Returns the order id, or None if rejected.
+        Must run on the main loop; the listener thread goes through accept_external_order."""
+
+        if not products:
+            print("[SYSTEM] External order rejected: No items provided.")
+            return None
 
-        order_id = self.next_manual_order_id
-        self.next_manual_order_id += 1
+        if order_id is None:
+            order_id = self._allocate_order_id()
 
         random_customer = random.choice(self.customers)
         customer_address_coords = (random_customer.x, random_customer.y)
@@ -124,46 +187,44 @@ class AutomatedRestaurantSystem:
             *customer_address_coords
         )
 
-        target_restaurant, _ = self._find_closest_restaurant(customer_coords)
+        order = Order(order_id, self.mock_customer_id, customer_address_coords, products)
+
+        target_restaurant, _ = self._route_order(customer_coords, order)
         if not target_restaurant:
             print("[SYSTEM] ERROR: Could not find any restaurant for external order.")
-            return
-
-        order_data = {
-            'order_id': order_id,
-            'customer_id': self.mock_customer_id,
-            'customer_address': customer_address_coords,
-            'items': external_items,
-            'total_items': len(external_items)
-        }
+            return None
 
         self.customer_map[self.mock_customer_id] = mock_customer
         self.active_customer_orders[order_id] = mock_customer
-        target_restaurant.receive_order(order_data)
+        self.order_placed_times[order_id] = self.clock.now()
+        target_restaurant.receive_order(order)
 
         print("=" * 40)
         print(f"🍕 NEW EXTERNAL ORDER {order_id} RECEIVED & ROUTED!")
-        print(f"Total Items: {len(external_items)}")
+        print(f"Total Items: {len(products)}")
         print(f"Delivery Target: House at {customer_address_coords}")
         print(f"Routed to: {target_restaurant.Name}")
         print("=" * 40)
+        return order_id
 
     def setup_system(self):
         """Initializes city, restaurants, chefs, and customers."""
 
         # 1. City Setup
-        self.city = City("NeoCity", 500000, 100)
+        self.city = City("NeoCity", 500000, 100, text_cache=text_cache, assets=assets)
+        self.fleet = DroneFleet(self.city, self.scheduler, self.clock)
 
         # 2. Multiple Restaurant/Equipment/Staff Setup (Remains the same)
         for i, restaurant_pos in enumerate(self.restaurant_positions):
             restaurant_name = f"Pasta la Vista {i + 1}"
-            restaurant = ItalianRestaurant(restaurant_name, f"Restaurant Address {i + 1}", system_reference=self)
+            restaurant = ItalianRestaurant(restaurant_name, f"Restaurant Address {i + 1}", system_reference=self,
+                                           scheduler=self.scheduler, clock=self.clock)
             self.restaurants.append(restaurant)
             restaurant.open_for_business()
             self.city.add_restaurant(restaurant, restaurant_pos)
 
-            ovens = [Oven(self.screen), Oven(self.screen)]
-            pans = [Pan(self.screen), Pan(self.screen)]
+            ovens = [Oven(self.screen, self.scheduler, self.clock), Oven(self.screen, self.scheduler, self.clock)]
+            pans = [Pan(self.screen, self.scheduler, self.clock), Pan(self.screen, self.scheduler, self.clock)]
             chef1 = Chef(0, 0, ovens, pans)
             chef2 = Chef(0, 0, ovens, pans)
             chef1.Name = f"Chef Mario {i + 1}"
@@ -175,11 +236,13 @@ class AutomatedRestaurantSystem:
             for pan in pans:
                 restaurant.add_pan(pan)
 
-            drone = DeliveryDrone(drone_id=i + 1, home_pos=restaurant_pos)
-            self.drones.append(drone)
-            restaurant.add_delivery_driver(drone)
+        # 3. Shared city-wide drone fleet, initially spread evenly over the restaurants
+        fleet_size = self.fleet_size if self.fleet_size is not None else len(self.restaurant_positions)
+        for i in range(fleet_size):
+            home_pos = self.restaurant_positions[i % len(self.restaurant_positions)]
+            self.drones.append(DeliveryDrone(drone_id=i + 1, home_pos=home_pos, fleet=self.fleet))
 
-            # 3. Customer Setup (Remains the same)
+        # 4. Customer Setup (Remains the same)
         customer_id_counter = 1
         for i, (x, y) in enumerate(self.city.houseCoords):
             customer_id = f"CUST{customer_id_counter}"
@@ -190,103 +253,57 @@ class AutomatedRestaurantSystem:
 
         print(f"System Setup Complete: {len(self.customers)} Customers, {len(self.restaurants)} Restaurants.")
 
-    def _find_closest_restaurant(self, customer_coords):
-        """Calculates and returns the closest restaurant object and its position."""
-        min_distance = float('inf')
-        closest_restaurant = None
-        closest_pos = None
-
-        cust_x, cust_y = customer_coords
-
-        for restaurant in self.restaurants:
-            rest_pos = self.city.get_restaurant_position(restaurant)
-            if not rest_pos: continue
-
-            distance = math.hypot(cust_x - rest_pos[0], cust_y - rest_pos[1])
-
-            if distance < min_distance:
-                min_distance = distance
-                closest_restaurant = restaurant
-                closest_pos = rest_pos
-
-        return closest_restaurant, closest_pos
-
-    # --- Gathers data for the Order Status UI ---
-    def _gather_all_active_orders(self):
-        """Gathers all currently active/queued/delivering orders from all restaurants for the status UI."""
-        all_active_orders = []
-
-        for rest in self.restaurants:
-            # 1. Check the order currently being processed/cooked
-            if rest.current_order:
-                order_id = rest.current_order['order_id']
-                ready_count = sum(1 for item in rest.items_to_package.get(order_id, {}).values() if item['ready'])
-
-                all_active_orders.append({
-                    'restaurant_name': rest.Name,
-                    'order_id': order_id,
-                    'state': rest.state.value,
-                    'items_total': len(rest.current_order['items']),
-                    'items_ready': ready_count
-                })
-
-            # 2. Check orders waiting in the queue
-            for order in rest.Orders:
-                all_active_orders.append({
-                    'restaurant_name': rest.Name,
-                    'order_id': order['order_id'],
-                    'state': 'QUEUED',
-                    'items_total': len(order['items']),
-                    'items_ready': 0
-                })
-
-            # 3. Check order out for delivery
-            if rest.delivery_in_progress_order:
-                all_active_orders.append({
-                    'restaurant_name': rest.Name,
-                    'order_id': rest.delivery_in_progress_order['order_id'],
-                    'state': 'DELIVERING',
-                    'items_total': len(rest.delivery_in_progress_order['items']),
-                    'items_ready': len(rest.delivery_in_progress_order['items'])  # All items ready for delivery
-                })
-
-        return all_active_orders
+    def _route_order(self, customer_coords, order):
+        """Picks the restaurant for an order using the configured routing policy."""
+        return self.routing_policy.choose_restaurant(self, customer_coords, order)
 
     # ----------------------------------------------------------------
 
+    def _allocate_order_id(self):
+        """Returns a system-wide unique order id (shared by automated and external orders)."""
+        return next(self.order_ids)
+
     def _generate_and_place_order(self):
-        # Automated orders logic remains the same
-        current_time = time.time()
-        if current_time - self.last_order_time >= self.order_interval:
-            self.last_order_time = current_time
-            customer = random.choice(self.customers)
-            customer_coords = (customer.x, customer.y)
+        """Next-order-arrival event. Places one automated order and schedules the next one."""
+        self.last_order_time += self.order_interval
+        self.scheduler.schedule_at(self.last_order_time + self.order_interval, self._generate_and_place_order)
 
-            target_restaurant, _ = self._find_closest_restaurant(customer_coords)
-            if not target_restaurant:
-                print("[SYSTEM] ERROR: Could not find any restaurant.")
-                return
+        customer = random.choice(self.customers)
+        customer_coords = (customer.x, customer.y)
 
-            order_data = customer.GenerateOrder()
-            order_id = order_data['order_id']
+        order = customer.GenerateOrder(order_id=self._allocate_order_id())
+        order_id = order.OrderID
 
-            self.active_customer_orders[order_id] = customer
-            target_restaurant.receive_order(order_data)
+        target_restaurant, _ = self._route_order(customer_coords, order)
+        if not target_restaurant:
+            print("[SYSTEM] ERROR: Could not find any restaurant.")
+            return
 
-            print(
-                f"[SYSTEM] New Automated Order {order_id} placed by {customer.CustomerID}. Routed to {target_restaurant.Name}.")
+        self.active_customer_orders[order_id] = customer
+        self.order_placed_times[order_id] = self.clock.now()
+        target_restaurant.receive_order(order)
 
-    def handle_completed_order(self, order_data):
+        print(
+            f"[SYSTEM] New Automated Order {order_id} placed by {customer.CustomerID}. Routed to {target_restaurant.Name}.")
+
+    def handle_completed_order(self, order):
         # Order completion logic remains the same
-        order_id = order_data['order_id']
+        order_id = order.OrderID
 
         if order_id in self.active_customer_orders:
             customer = self.active_customer_orders.pop(order_id)
-            customer.ReceiveOrder(order_data)
+            customer.ReceiveOrder(order)
             self.orders_processed += 1
+
+            # End-to-end latency: placed -> delivered (simulated seconds)
+            placed_time = self.order_placed_times.pop(order_id, None)
+            if placed_time is not None:
+                latency = self.clock.now() - placed_time
+                self.total_delivery_latency += latency
+                self.max_delivery_latency = max(self.max_delivery_latency, latency)
             print(f"[SYSTEM] Order {order_id} completed and removed from active list.")
 
-        if order_data['customer_id'] == self.mock_customer_id:
+        if order.CustomerID == self.mock_customer_id:
             if self.mock_customer_id in self.customer_map:
                 del self.customer_map[self.mock_customer_id]
             print(f"[System] Temporary external customer (ID {self.mock_customer_id}) cleaned up.")
@@ -294,81 +311,236 @@ class AutomatedRestaurantSystem:
     def update(self):
         """Main update loop for the simulation logic."""
 
-        # 1. Update the Order Status UI (Scheduled safely on the other thread)
-        all_active_orders = self._gather_all_active_orders()
-        self.tkinter_thread.schedule_status_update(all_active_orders)
-
-        # 2. Simulation Logic
-        self._generate_and_place_order()
-        for rest in self.restaurants:
-            rest.update()
-
-    def draw(self):
-        """Draw all simulation elements on the screen."""
-        self.screen.fill((255, 255, 255))
-
-        # Drawing logic remains the same
-        self.city.show_city_map(self.screen)
+        # 1. Update the Order Status UI (Scheduled safely on the other thread) with the orders that changed,
+        #    once the previous publish was delivered
+        registry = self.order_registry
+        if self.tkinter_thread and registry.has_changes():
+            if self.tkinter_thread.can_publish():
+                self.tkinter_thread.publish_status(registry.drain_changes())
+            elif not self.tkinter_thread.is_running():
+                registry.stop_tracking() # The Tk loop stopped: nothing will drain the changes again
+
+        # 2. External orders handed off by the listener thread since the last tick
+        self._drain_external_orders()
+
+        # 3. Simulation Logic: only the components with an event due are touched
+        self.scheduler.run_due()
+
+    def draw(self, alpha=1.0):
+        """Draw all simulation elements on the screen.
+        alpha (0..1) is how far the render time lies between the previous and the latest simulation
+        step; with a virtual clock the drones are drawn at that interpolated time.
+        Layered: the static background (map, restaurant icons, houses) comes cached from the City,
+        and only the dynamic layers (restaurant statuses, drones, HUD) are drawn each frame. Last
+        frame's dynamic rects are restored from the background, and only the rects touched in
+        either frame are pushed to the display."""
+        screen = self.screen
+        global font_small, font_medium, font_large, text_cache
+        background = self.city.get_background(font_small)
+        full_redraw = background is not self._drawn_background
+        if full_redraw:
+            screen.blit(background, (0, 0))
+            self._drawn_background = background
+        else:
+            for rect in self._dirty_rects:
+                screen.blit(background, rect, rect) # Erase last frame's dynamic layer
+        dirty = []
 
         restaurant_statuses = [f"{rest.Name}: {rest.state.value}" for rest in self.restaurants]
-        global font_medium
-        self.city.show_restaurant_icon(self.screen, font_medium, restaurant_statuses)
-
-        global font_small
-        self.city.draw_customer_houses(self.screen, font_small)
+        dirty.extend(self.city.draw_restaurant_statuses(screen, font_medium, restaurant_statuses))
 
         drone_color = (100, 100, 255)
         drone_radius = 8
-        for i, drone in enumerate(self.drones):
-            if hasattr(drone, 'x') and hasattr(drone, 'y'):
-                drone_x, drone_y = int(drone.x), int(drone.y)
-                pygame.draw.circle(self.screen, drone_color, (drone_x, drone_y), drone_radius, 0)
-                drone_status_text = f"Drone {drone.DroneID}: {drone.Status}"
-                drone_text_surface = font_small.render(drone_status_text, True, (0, 0, 0))
-                rest_pos = self.restaurant_positions[i]
-                self.screen.blit(drone_text_surface, (rest_pos[0] + 30, rest_pos[1] - 40))
-
-        orders_in_queue = sum(len(rest.Orders) for rest in self.restaurants)
+        render_time = None # Real and scaled clocks: the current time
+        if isinstance(self.clock, VirtualClock):
+            render_time = self.clock.now() - (1.0 - alpha) * self.clock.step_size
+        self.fleet.update_positions(render_time) # One vectorized pass for the whole fleet
+        positions = self.fleet.state.position
+        for drone in self.drones:
+            drone_x, drone_y = int(positions[drone.row, 0]), int(positions[drone.row, 1])
+            dirty.append(pygame.draw.circle(screen, drone_color, (drone_x, drone_y), drone_radius, 0))
+            drone_status_text = f"Drone {drone.DroneID}: {drone.Status}"
+            drone_text_surface = text_cache.render(font_small, drone_status_text, (0, 0, 0))
+            dirty.append(screen.blit(drone_text_surface, (drone_x + 12, drone_y - 20)))
+
+        orders_in_queue = self.order_registry.state_count(OrderRegistry.QUEUED)
 
         # Draw Simulation Status Info
         status_text = f"Orders Processed: {self.orders_processed}"
-        text_surface = font_large.render(status_text, True, (0, 0, 0))
-        self.screen.blit(text_surface, (10, 10))
+        text_surface = text_cache.render(font_large, status_text, (0, 0, 0))
+        dirty.append(screen.blit(text_surface, (10, 10)))
         queue_text = f"Orders In Queue (Total): {orders_in_queue}"
-        queue_surface = font_medium.render(queue_text, True, (0, 0, 0))
-        self.screen.blit(queue_surface, (10, 50))
+        queue_surface = text_cache.render(font_medium, queue_text, (0, 0, 0))
+        dirty.append(screen.blit(queue_surface, (10, 50)))
         active_text = f"Active Orders (System): {len(self.active_customer_orders)}"
-        active_surface = font_medium.render(active_text, True, (0, 0, 0))
-        self.screen.blit(active_surface, (10, 80))
+        active_surface = text_cache.render(font_medium, active_text, (0, 0, 0))
+        dirty.append(screen.blit(active_surface, (10, 80)))
 
         mode_text = "Mode: Pure Simulation (Status Pop-up Active)"
-        mode_surface = font_medium.render(mode_text, True, (0, 0, 0))
-        self.screen.blit(mode_surface, (10, 120))
+        mode_surface = text_cache.render(font_medium, mode_text, (0, 0, 0))
+        dirty.append(screen.blit(mode_surface, (10, 120)))
 
-        pygame.display.flip()
+        if full_redraw:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self._dirty_rects + dirty)
+        self._dirty_rects = dirty
 
     def run_simulation(self):
-        """The main simulation loop."""
+        """The main simulation loop, with a fixed timestep decoupled from rendering.
+        Wall-clock frame time is added to an accumulator, and the simulation runs one update()
+        per 1/sim_rate seconds in it, however long drawing takes. After a slow frame several
+        steps run back to back (up to max_frame_lag seconds' worth), so a lower render rate
+        does not slow the simulation; each frame is drawn interpolated between the last two steps."""
+        step_interval = 1.0 / self.sim_rate
+        is_virtual = isinstance(self.clock, VirtualClock)
+        accumulator = 0.0
+        previous = time.perf_counter()
         while self.is_running:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     self.is_running = False
 
-            self.update()
-            self.draw()
-            clock.tick(30)
+            now = time.perf_counter()
+            accumulator = min(accumulator + now - previous, self.max_frame_lag)
+            previous = now
+            while accumulator >= step_interval:
+                if is_virtual:
+                    self.clock.step() # Step mode: one fixed slice of simulated time per simulation step
+                self.update()
+                self.sim_steps += 1
+                accumulator -= step_interval
+
+            self.draw(alpha=accumulator / step_interval)
+            self.frames += 1
+            clock.tick(self.fps)
 
         pygame.quit()
-        
+        self._stop_order_listener()
         self.tkinter_thread.stop()
         sys.exit()
 
+    def _wait_for_next_event(self, sim_end):
+        """Sleeps (real or scaled clock) until the next event or sim_end is due, an external order
+        is handed off, or max_idle_wait passes."""
+        wake_time = self.scheduler.next_event_time()
+        if sim_end is not None and (wake_time is None or sim_end < wake_time):
+            wake_time = sim_end
+        wait = self.max_idle_wait if wake_time is None else min(self.clock.seconds_until(wake_time), self.max_idle_wait)
+        if wait > 0:
+            self.order_handoff.wait(wait)
+
+    def run_headless(self, duration=None):
+        """Runs the simulation logic as fast as possible, without drawing or a frame cap.
+        Stops after `duration` simulated seconds, or when is_running is cleared (Ctrl+C).
+        With a VirtualClock the clock jumps straight to the next event; with a real or scaled clock
+        the loop sleeps until the next event is due or an external order arrives."""
+        start_time = time.time()
+        sim_start = self.clock.now()
+        sim_end = sim_start + duration if duration is not None else None
+        is_virtual = isinstance(self.clock, VirtualClock)
+        ticks = 0
+        print(f"[SYSTEM] Running headless simulation (duration: {duration if duration else 'unlimited'}s).")
+        try:
+            while self.is_running:
+                if is_virtual:
+                    next_event_time = self.scheduler.next_event_time()
+                    if next_event_time is None or (sim_end is not None and next_event_time > sim_end):
+                        break
+                    self.clock.advance_to(next_event_time)
+                else:
+                    self._wait_for_next_event(sim_end)
+                self.update()
+                ticks += 1
+                if sim_end is not None and self.clock.now() >= sim_end:
+                    break
+        except KeyboardInterrupt:
+            print("[SYSTEM] Headless simulation interrupted.")
+        finally:
+            self.is_running = False
+            self._stop_order_listener()
+
+        elapsed = time.time() - start_time
+        simulated = self.clock.now() - sim_start
+        print("=" * 50)
+        print(f"Headless run finished after {elapsed:.1f}s ({ticks} ticks, {ticks / max(elapsed, 1e-9):.0f} ticks/s).")
+        print(f"Simulated time: {simulated:.1f}s ({simulated / max(elapsed, 1e-9):.0f}x real time).")
+        print(f"Orders Processed: {self.orders_processed}")
+        print(f"Active Orders (System): {len(self.active_customer_orders)}")
+        if self.orders_processed:
+            average_latency = self.total_delivery_latency / self.orders_processed
+            print(f"Delivery latency ({self.routing_policy.name} routing): "
+                  f"avg {average_latency:.1f}s, max {self.max_delivery_latency:.1f}s")
+        delivered = [order for rest in self.restaurants for order in rest.completed_orders]
+        if delivered:
+            revenue = get_catalog().price_orders(delivered).sum() # One vectorized pass over every delivered order
+            print(f"Revenue: ${revenue:,.2f} from {len(delivered)} delivered orders")
+        if self.order_handoff.drained:
+            print(f"External orders: {self.order_handoff.drained}, intake lag "
+                  f"avg {self.order_handoff.average_lag() * 1000:.2f}ms, max {self.order_handoff.max_lag * 1000:.2f}ms")
+        print("=" * 50)
+        return self.orders_processed
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Automated Restaurant Delivery Simulation")
+    parser.add_argument("--headless", action="store_true",
+                        help="Run the simulation without pygame or Tk windows.")
+    parser.add_argument("--duration", type=float, default=None,
+                        help="Stop a headless run after this many simulated seconds.")
+    parser.add_argument("--order-interval", type=float, default=5,
+                        help="Simulated seconds between automated orders.")
+    parser.add_argument("--clock", choices=["real", "scaled", "virtual"], default="real",
+                        help="Simulation clock: wall-clock, scaled wall-clock or fully virtual time.")
+    parser.add_argument("--time-scale", type=float, default=100,
+                        help="Speed-up factor for --clock scaled.")
+    parser.add_argument("--step", type=float, default=1 / 30,
+                        help="Simulated seconds per simulation step for --clock virtual in the visual mode.")
+    parser.add_argument("--sim-rate", type=float, default=30,
+                        help="Simulation steps per second in the visual mode, independent of the frame rate.")
+    parser.add_argument("--fps", type=int, default=30,
+                        help="Frame rate cap of the visual mode.")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="Random seed, for deterministic benchmark runs.")
+    parser.add_argument("--no-listener", action="store_true",
+                        help="Do not open the UDP order listener.")
+    parser.add_argument("--status-rate", type=float, default=10,
+                        help="Maximum order status window refreshes per second.")
+    parser.add_argument("--stream-port", type=int, default=STREAM_PORT,
+                        help="TCP port for length-prefixed order batches (0 disables it).")
+    parser.add_argument("--recv-buffer", type=int, default=4 * 1024 * 1024,
+                        help="Receive buffer size (SO_RCVBUF, bytes) of the UDP order socket.")
+    parser.add_argument("--intake-limit", type=int, default=10000,
+                        help="Orders the listener buffers before it starts dropping datagrams.")
+    parser.add_argument("--drones", type=int, default=None,
+                        help="Size of the shared drone fleet (default: one drone per restaurant).")
+    parser.add_argument("--routing", choices=sorted(ROUTING_POLICIES), default="nearest",
+                        help="Order routing policy: nearest restaurant or lowest predicted delivery time.")
+    return parser.parse_args(argv)
+
 
 if __name__ == '__main__':
+    args = parse_args()
+    if args.seed is not None:
+        random.seed(args.seed)
+    sim_clock = create_clock(args.clock, scale=args.time_scale, step_size=args.step)
+
+    if args.headless:
+        game = AutomatedRestaurantSystem(headless=True, order_interval=args.order_interval, clock=sim_clock,
+                                         listen=not args.no_listener, routing=args.routing, fleet_size=args.drones,
+                                         recv_buffer_size=args.recv_buffer, intake_limit=args.intake_limit,
+                                         stream_port=args.stream_port or None)
+        game.run_headless(duration=args.duration)
+        sys.exit()
+
     try:
-        game = AutomatedRestaurantSystem(screen)
+        game = AutomatedRestaurantSystem(init_display(), order_interval=args.order_interval, clock=sim_clock,
+                                         status_rate=args.status_rate, sim_rate=args.sim_rate, fps=args.fps,
+                                         listen=not args.no_listener, routing=args.routing, fleet_size=args.drones,
+                                         recv_buffer_size=args.recv_buffer, intake_limit=args.intake_limit,
+                                         stream_port=args.stream_port or None)
         game.run_simulation()
     except Exception as e:
         print(f"An error occurred during simulation: {e}")
         pygame.quit()
-        sys.exit()
\ No newline at end of file
+        sys.exit()
@@ -0,0 +1,117 @@
+# MenuCatalog.py
+import json
+import os
+import numpy as np
+from OrderProtocol import ITEM_KINDS, PIZZA_SIZES, PASTA_TYPES, SAUCES, TOPPINGS
+
+MENU_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'menu.json')
+
+PIZZA = ITEM_KINDS.index('pizza')
+PASTA = ITEM_KINDS.index('pasta')
+
+
+class MenuCatalog:
+    """
+    Prices of the menu, loaded once from a data file (menu.json) and indexed by the
+    numeric codes of the binary wire format: size/pasta-type code, sauce code and
+    topping code mean the same thing here as in OrderProtocol, which is checked on load.
+    Each item carries its codes packed into one integer (see item_code), so pricing one
+    item is a few array lookups, and price_orders() prices any number of orders in one
+    NumPy pass.
+    Names the menu does not know get the default price of their kind, the same as
+    before the catalog existed; their code is the extra last slot of each price array.
+    """
+
+    def __init__(self, menu):
+        pizza, pasta = menu['pizza'], menu['pasta']
+        self.pizza_sizes = self._names(pizza['sizes'], PIZZA_SIZES, 'pizza size')
+        self.pasta_types = self._names(pasta['types'], PASTA_TYPES, 'pasta type')
+        self.sauces = self._names(pasta['sauces'], SAUCES, 'sauce')
+        self.toppings = self._names(menu['toppings'], TOPPINGS, 'topping')
+
+        self._size_codes = {name: code for code, name in enumerate(self.pizza_sizes)}
+        self._pasta_codes = {name: code for code, name in enumerate(self.pasta_types)}
+        self._sauce_codes = {name: code for code, name in enumerate(self.sauces)}
+
+        # Price arrays indexed by code; the last entry is the price of an unknown name
+        self.pizza_prices = np.array([entry['price'] for entry in pizza['sizes']] + [pizza['default_price']], dtype=float)
+        self.pasta_prices = np.array([entry['price'] for entry in pasta['types']] + [pasta['default_price']], dtype=float)
+        self.sauce_prices = np.array([entry['price'] for entry in pasta['sauces']] + [0], dtype=float)
+        self.topping_prices = np.array([pizza['topping_price'], pasta['topping_price']], dtype=float) # by kind code
+
+    @staticmethod
+    def _names(entries, wire_table, label):
+        """Returns the entry names in code order, checking each code against the wire table."""
+        names = []
+        for expected_code, entry in enumerate(sorted(entries, key=lambda entry: entry['code'])):
+            code, name = entry['code'], entry['name']
+            if code != expected_code:
+                raise ValueError(f"menu {label} codes must be 0..n-1, found {code} for {name!r}")
+            if code < len(wire_table) and wire_table[code] != name:
+                raise ValueError(f"menu {label} code {code} is {name!r}, but {wire_table[code]!r} on the wire")
+            names.append(name)
+        return tuple(names)
+
+    @classmethod
+    def load(cls, path=MENU_FILE):
+        with open(path, encoding='utf-8') as menu_file:
+            return cls(json.load(menu_file))
+
+    # --- Item codes ---
+    # Every item is reduced to one integer when it is created (Pizza/Pasta.MenuCode):
+    # kind << 48 | size or pasta-type code << 40 | sauce code << 32 | topping count
+
+    def pizza_code(self, size, topping_count):
+        return self.item_code(PIZZA, self._size_codes.get(size, len(self.pizza_sizes)), 0, topping_count)
+
+    def pasta_code(self, pasta_type, sauce, topping_count):
+        return self.item_code(PASTA, self._pasta_codes.get(pasta_type, len(self.pasta_types)),
+                              self._sauce_codes.get(sauce, len(self.sauces)), topping_count)
+
+    @staticmethod
+    def item_code(kind, variant_code, sauce_code, topping_count):
+        return kind << 48 | variant_code << 40 | sauce_code << 32 | topping_count
+
+    # --- Pricing ---
+
+    def item_price(self, code):
+        """Price of one item code."""
+        kind, variant, sauce, toppings = code >> 48, code >> 40 & 0xFF, code >> 32 & 0xFF, code & 0xFFFFFFFF
+        if kind == PIZZA:
+            return float(self.pizza_prices[variant] + toppings * self.topping_prices[PIZZA])
+        return float(self.pasta_prices[variant] + self.sauce_prices[sauce] + toppings * self.topping_prices[PASTA])
+
+    def price_codes(self, codes):
+        """Prices of an array of item codes, computed with array operations only."""
+        codes = np.asarray(codes, dtype=np.int64)
+        kind, variant, sauce, toppings = codes >> 48, codes >> 40 & 0xFF, codes >> 32 & 0xFF, codes & 0xFFFFFFFF
+        is_pizza = kind == PIZZA
+        # Both branches are evaluated for every item, so codes are clamped into each price table
+        pizza = self.pizza_prices[np.minimum(variant, len(self.pizza_prices) - 1)]
+        pasta = (self.pasta_prices[np.minimum(variant, len(self.pasta_prices) - 1)]
+                 + self.sauce_prices[np.minimum(sauce, len(self.sauce_prices) - 1)])
+        return np.where(is_pizza, pizza, pasta) + toppings * self.topping_prices[kind]
+
+    def price_orders(self, orders):
+        """Returns an array with the total of every order, priced in one vectorized pass over all
+        of their items. Frozen orders keep the result as their cached total."""
+        item_counts = np.fromiter((len(order.Products) for order in orders), np.int64, len(orders))
+        codes = np.fromiter((item.MenuCode for order in orders for item in order.Products), np.int64,
+                            int(item_counts.sum()))
+        order_index = np.repeat(np.arange(len(orders)), item_counts)
+        totals = np.bincount(order_index, weights=self.price_codes(codes), minlength=len(orders))
+
+        for order, total in zip(orders, totals.tolist()):
+            order.cache_total(total)
+        return totals
+
+
+_catalog = None
+
+
+def get_catalog():
+    """The shared catalog, loaded from MENU_FILE on first use."""
+    global _catalog
+    if _catalog is None:
+        _catalog = MenuCatalog.load()
+    return _catalog
@@ -1,42 +1,94 @@
 # Order.py
+from Pizza import Pizza
+from Pasta import Pasta
+from MenuCatalog import PIZZA
+
+ITEM_CLASSES = {'pizza': Pizza, 'pasta': Pasta}
+
+
+def create_products(items_list):
+    """Converts items in the list format ([id, 'pizza', size, ...] / [id, 'pasta', type, sauce, ...])
+    to Pizza/Pasta objects. Raises ValueError if an item is malformed or of an unknown kind."""
+    products = []
+    for item in items_list:
+        try:
+            products.append(ITEM_CLASSES[item[1]](item))
+        except (KeyError, IndexError, TypeError) as e:
+            raise ValueError(f"invalid item {item!r}") from e
+    return products
+
 
 class Order:
-    def __init__(self, order_data, pizza_class, pasta_class):
-        self.OrderID = order_data['order_id']
-        self.CustomerData = {
-            'customer_id': order_data['customer_id'],
-            'customer_address': order_data['customer_address']
-        }
-        self.PizzaClass = pizza_class
-        self.PastaClass = pasta_class
-        self.Products = self._create_products(order_data['items'])
+    """
+    One customer order, built once when the order enters the system (Customer.GenerateOrder
+    or external ingestion) and passed by reference through routing, the restaurant, chef,
+    ovens/pans and the delivery drone. __slots__ keeps each order and item small and its
+    attribute lookups cheap at high order volume; to_dict_format() is only for the edges.
+    Once a restaurant accepts the order it is frozen: its items can no longer change, so
+    its total is computed once (or by MenuCatalog.price_orders for many orders) and cached.
+    """
+
+    __slots__ = ('OrderID', 'CustomerID', 'CustomerAddress', 'Products', 'Status', 'Restaurant',
+                 'ItemsReady', 'CompletionTime', 'Frozen', '_total')
+
+    def __init__(self, order_id, customer_id, customer_address, products=()):
+        self.OrderID = order_id
+        self.CustomerID = customer_id
+        self.CustomerAddress = customer_address
+        self.Products = list(products)
         self.Status = "received"
         self.Restaurant = None
+        self.ItemsReady = 0 # Items cooked so far
+        self.CompletionTime = None # Simulated time the order was delivered
+        self.Frozen = False
+        self._total = None # Cached CalculateTotal() of a frozen order
+
+    @classmethod
+    def from_dict(cls, order_data):
+        """Builds an order from the dictionary format (see to_dict_format)."""
+        return cls(order_data['order_id'], order_data['customer_id'], order_data['customer_address'],
+                   create_products(order_data['items']))
 
-    def _create_products(self, items_list):
-        """Convert your list items to Pizza/Pasta objects"""
-        products = []
-        for item in items_list:
-            if item[1] == 'pizza':
-                products.append(self.PizzaClass(item))
-            elif item[1] == 'pasta':
-                products.append(self.PastaClass(item))
-        return products
+    @property
+    def CustomerData(self):
+        return {'customer_id': self.CustomerID, 'customer_address': self.CustomerAddress}
+
+    def freeze(self):
+        """Fixes the items of the order (done when a restaurant accepts it)."""
+        self.Frozen = True
+
+    def _check_not_frozen(self):
+        if self.Frozen:
+            raise ValueError(f"Order {self.OrderID} is frozen, its items cannot change")
 
     def AddPizza(self, pizza_data):
         """Add pizza using your list format"""
-        pizza = self.PizzaClass(pizza_data)
+        self._check_not_frozen()
+        pizza = Pizza(pizza_data)
         self.Products.append(pizza)
         return pizza
 
     def AddPasta(self, pasta_data):
         """Add pasta using your list format"""
-        pasta = self.PastaClass(pasta_data)
+        self._check_not_frozen()
+        pasta = Pasta(pasta_data)
         self.Products.append(pasta)
         return pasta
 
+    def AllItemsReady(self):
+        return self.ItemsReady >= len(self.Products)
+
     def CalculateTotal(self):
-        return sum(product.GetPrice() for product in self.Products)
+        if self._total is not None:
+            return self._total
+        total = sum(product.GetPrice() for product in self.Products)
+        self.cache_total(total)
+        return total
+
+    def cache_total(self, total):
+        """Keeps a computed total, but only once the items can no longer change."""
+        if self.Frozen:
+            self._total = total
 
     def GetStatus(self):
         return self.Status
@@ -51,21 +103,17 @@ class Order:
         print("\n" + "=" * 60)
         print(f"📦 ORDER #{self.OrderID} DETAILS")
         print("=" * 60)
-        print(f"Customer: {self.CustomerData['customer_id']}")
-        print(f"Address: {self.CustomerData['customer_address']}")
+        print(f"Customer: {self.CustomerID}")
+        print(f"Address: {self.CustomerAddress}")
         print(f"Status: {self.Status}")
         print("-" * 40)
 
         # Combine and display all products together
-        all_products = self.get_all_products()
-        total = 0
-
-        for i, product in enumerate(all_products, 1):
+        for i, product in enumerate(self.get_all_products(), 1):
             print(f"{i}. {product.GetDetailedDescription()}")
-            total += product.GetPrice()
 
         print("-" * 40)
-        print(f"TOTAL: ${total:.2f}")
+        print(f"TOTAL: ${self.CalculateTotal():.2f}")
         print("=" * 60 + "\n")
 
     def get_all_products(self):
@@ -74,15 +122,15 @@ class Order:
 
     def get_pizzas(self):
         """Get only pizza products"""
-        return [product for product in self.Products if hasattr(product, 'Type') and product.Type == 'pizza']
+        return self.get_items_by_type('pizza')
 
     def get_pastas(self):
         """Get only pasta products"""
-        return [product for product in self.Products if hasattr(product, 'Type') and product.Type == 'pasta']
+        return self.get_items_by_type('pasta')
 
     def get_items_by_type(self, item_type):
         """Get items by type ('pizza' or 'pasta')"""
-        return [product for product in self.Products if hasattr(product, 'Type') and product.Type == item_type]
+        return [product for product in self.Products if product.Type == item_type]
 
     def set_status(self, status):
         self.Status = status
@@ -91,20 +139,19 @@ class Order:
         """Convert back to your dictionary format for compatibility"""
         return {
             'order_id': self.OrderID,
-            'customer_id': self.CustomerData['customer_id'],
-            'customer_address': self.CustomerData['customer_address'],
+            'customer_id': self.CustomerID,
+            'customer_address': self.CustomerAddress,
             'items': [product.to_list_format() for product in self.Products],
             'total_items': len(self.Products)
         }
 
     def get_order_summary(self):
         """Get a quick summary of the order"""
-        pizzas = self.get_pizzas()
-        pastas = self.get_pastas()
+        pizza_count = sum(1 for product in self.Products if product.KindCode == PIZZA)
         return {
             'order_id': self.OrderID,
             'total_items': len(self.Products),
-            'pizza_count': len(pizzas),
-            'pasta_count': len(pastas),
+            'pizza_count': pizza_count,
+            'pasta_count': len(self.Products) - pizza_count,
             'total_price': self.CalculateTotal()
-        }
\ No newline at end of file
+        }
@@ -0,0 +1,63 @@
+# OrderHandoff.py
+import threading
+import time
+from collections import deque
+
+
+class OrderHandoff:
+    """
+    Single-producer/single-consumer handoff from the order listener thread to the
+    simulation loop. The listener push()es validated orders; the main loop drain()s
+    them in bulk once per tick and is the only thread that touches the simulation
+    state. deque.append/popleft are atomic, so neither side takes a lock.
+    An idle loop can sleep in wait(), which returns as soon as an order is pushed.
+    Every order is stamped on push, which makes this the one place intake lag
+    (wall-clock time from receipt to entering the simulation) is measured.
+    """
+
+    def __init__(self):
+        self._orders = deque() # (order_id, products, pushed_at)
+        self.pushed = 0
+        self.drained = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
+        self._arrived = threading.Event()
+
+    def push(self, order_id, products):
+        """Called by the listener thread."""
+        self._orders.append((order_id, products, time.monotonic()))
+        self.pushed += 1
+        self._arrived.set()
+
+    def drain(self):
+        """Called by the main loop: removes and returns every (order_id, products) pushed so far."""
+        orders = self._orders
+        count = len(orders)
+        if not count:
+            return []
+
+        now = time.monotonic()
+        drained = []
+        for _ in range(count):
+            order_id, products, pushed_at = orders.popleft()
+            lag = now - pushed_at
+            self.total_lag += lag
+            if lag > self.max_lag:
+                self.max_lag = lag
+            drained.append((order_id, products))
+        self.drained += count
+        return drained
+
+    def wait(self, timeout):
+        """Called by the main loop: blocks until an order is pushed or timeout seconds pass.
+        Returns True if orders are waiting to be drained."""
+        if not self._orders:
+            self._arrived.wait(timeout)
+        self._arrived.clear()
+        return bool(self._orders)
+
+    def average_lag(self):
+        return self.total_lag / self.drained if self.drained else 0.0
+
+    def __len__(self):
+        return len(self._orders)
@@ -0,0 +1,299 @@
+# OrderIngestServer.py
+import asyncio
+import socket
+import threading
+import time
+from collections import OrderedDict
+from OrderProtocol import (UDP_PORT, STREAM_PORT, FRAME_HEADER, MAX_FRAME_SIZE, REJECTED, decode_orders,
+                           encode_ack, encode_frame, is_binary)
+
+
+class DedupCache:
+    """
+    Idempotency keys of recently accepted orders -> the order id they were given.
+    Entries expire after ttl seconds (wall-clock: resends happen in real time) and the
+    oldest are evicted beyond max_entries. Keys are kept in arrival order, so eviction
+    only ever looks at the front.
+    """
+
+    def __init__(self, ttl=600.0, max_entries=100000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict() # key -> (order_id, expiry time)
+        self.hits = 0
+
+    def get(self, key, now=None):
+        """Order id already assigned to key, or None."""
+        now = time.monotonic() if now is None else now
+        self._evict(now)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def add(self, key, order_id, now=None):
+        now = time.monotonic() if now is None else now
+        self._entries[key] = (order_id, now + self.ttl)
+        self._entries.move_to_end(key)
+        self._evict(now)
+
+    def _evict(self, now):
+        entries = self._entries
+        while entries:
+            key, (_, expiry) = next(iter(entries.items()))
+            if expiry > now and len(entries) <= self.max_entries:
+                break
+            del entries[key]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class _OrderDatagramProtocol(asyncio.DatagramProtocol):
+    """Hands every received datagram to the server's intake queue and sends acks back."""
+
+    transport = None
+
+    def __init__(self, server, sock):
+        self.server = server
+        self.sock = sock
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.server._enqueue(data, addr, self.reply)
+
+    def reply(self, payload, addr):
+        try:
+            if self.transport is not None:
+                self.transport.sendto(payload, addr)
+            else:
+                self.sock.sendto(payload, addr)
+        except OSError:
+            pass # The client resends if the ack is lost
+
+    def error_received(self, exc):
+        print(f"Error in order listener: {exc}")
+
+
+class OrderIngestServer:
+    """
+    asyncio order server for GUI.py and bulk clients, running its own event loop on a
+    background thread. Orders arrive as UDP datagrams or, for large baskets and
+    batches, as length-prefixed frames on persistent TCP connections (see OrderProtocol).
+    Each time the socket becomes readable the server drains up to batch_size datagrams
+    with non-blocking recvfrom calls (asyncio's own datagram transport reads one per
+    wakeup, which loses bursts to a full kernel buffer).
+    Datagrams go into a bounded intake queue (when it is full they are dropped and
+    counted instead of stalling the socket; TCP readers wait instead, which pushes back
+    on the sender through TCP flow control). A consumer task drains the queue the same
+    way and passes each order's items to on_order, which returns the order id (None if
+    the order was rejected). Orders with an idempotency key are acknowledged, rejected
+    ones with order id REJECTED; a resent key found in the dedup cache is acknowledged
+    again without calling on_order.
+    Shutdown is immediate: there is no receive timeout to wait out.
+    """
+
+    def __init__(self, on_order, host='', port=UDP_PORT, stream_port=STREAM_PORT,
+                 recv_buffer_size=4 * 1024 * 1024, max_pending=10000, batch_size=512, dedup_ttl=600.0):
+        self.on_order = on_order
+        self.host = host
+        self.port = port
+        self.stream_port = stream_port # TCP port for framed messages; None disables the stream transport
+        self.recv_buffer_size = recv_buffer_size # Requested SO_RCVBUF; the OS may cap it
+        self.max_pending = max_pending
+        self.batch_size = batch_size
+        self.dedup = DedupCache(dedup_ttl)
+
+        self.received = 0
+        self.connections = 0 # Open TCP connections
+        self.dropped = 0   # Datagrams discarded because the intake queue was full
+        self.malformed = 0
+        self.duplicates = 0 # Resent orders answered from the dedup cache
+        self.failed = 0     # Messages whose handling raised unexpectedly
+
+        self._loop = None
+        self._queue = None
+        self._stopping = None
+        self._stream_tasks = set() # Handlers of open TCP connections, cancelled on shutdown
+        self._thread = None
+        self._ready = threading.Event()
+        self._bound = False
+
+    def start(self):
+        """Starts the server thread. Returns False if the port could not be bound."""
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        return self._bound
+
+    def stop(self):
+        """Closes the socket and stops the event loop thread."""
+        if self._loop is not None and self._stopping is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._stopping.set)
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self._serve())
+        finally:
+            self._loop.close()
+            self._ready.set()
+        print("Listener thread shut down.")
+
+    async def _serve(self):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.recv_buffer_size)
+            sock.bind((self.host, self.port))
+        except OSError as e:
+            print(f"FATAL: Could not bind to port {self.port}. Is it already in use? Error: {e}")
+            sock.close()
+            return
+
+        self._queue = asyncio.Queue(self.max_pending)
+        self._stopping = asyncio.Event()
+        protocol = _OrderDatagramProtocol(self, sock)
+        sock.setblocking(False)
+        try:
+            self._loop.add_reader(sock.fileno(), self._read_ready, sock, protocol)
+            transport = None
+        except NotImplementedError: # Proactor event loops (Windows) have no add_reader
+            transport, _ = await self._loop.create_datagram_endpoint(lambda: protocol, sock=sock)
+
+        stream_server = None
+        if self.stream_port is not None:
+            try:
+                stream_server = await asyncio.start_server(self._handle_stream, self.host or None, self.stream_port)
+            except OSError as e:
+                print(f"Warning: Could not open TCP order port {self.stream_port}, only UDP is available. Error: {e}")
+        consumer = asyncio.ensure_future(self._consume())
+        self._bound = True
+        self._ready.set()
+
+        print("=" * 50)
+        print(f"📡 KITCHEN ORDER RECEIVER 📡")
+        print(f"Listening for external orders on port {self.port} "
+              f"(receive buffer {sock.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)} bytes)...")
+        if stream_server is not None:
+            print(f"Accepting order batches over TCP on port {self.stream_port}.")
+        print("=" * 50)
+
+        try:
+            await self._stopping.wait()
+        finally:
+            if stream_server is not None:
+                stream_server.close()
+                for task in list(self._stream_tasks):
+                    task.cancel()
+                await asyncio.gather(*self._stream_tasks, return_exceptions=True)
+            if transport is None:
+                self._loop.remove_reader(sock.fileno())
+                sock.close()
+            else:
+                transport.close()
+            consumer.cancel()
+            await asyncio.gather(consumer, return_exceptions=True)
+
+    def _read_ready(self, sock, protocol):
+        """Drains up to batch_size datagrams from the socket in one wakeup."""
+        for _ in range(self.batch_size):
+            try:
+                data, addr = sock.recvfrom(65535)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as exc:
+                protocol.error_received(exc)
+                return
+            protocol.datagram_received(data, addr)
+
+    def _enqueue(self, data, addr, reply):
+        try:
+            self._queue.put_nowait((data, addr, reply))
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def _handle_stream(self, reader, writer):
+        """Reads length-prefixed messages from one persistent TCP connection until it closes."""
+        addr = writer.get_extra_info('peername')
+
+        def reply(payload, _addr):
+            if not writer.is_closing():
+                writer.write(encode_frame(payload))
+
+        self.connections += 1
+        self._stream_tasks.add(asyncio.current_task())
+        try:
+            while True:
+                header = await reader.readexactly(FRAME_HEADER.size)
+                (length,) = FRAME_HEADER.unpack(header)
+                if length > MAX_FRAME_SIZE:
+                    print(f"Error: Frame of {length} bytes from {addr} exceeds the limit. Closing the connection.")
+                    break
+                data = await reader.readexactly(length)
+                await self._queue.put((data, addr, reply)) # Waits while the intake queue is full
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass # Client closed the connection, or the server is shutting down
+        finally:
+            self.connections -= 1
+            self._stream_tasks.discard(asyncio.current_task())
+            writer.close()
+
+    async def _consume(self):
+        queue = self._queue
+        while True:
+            data, addr, reply = await queue.get()
+            self._handle_safely(data, addr, reply)
+            # Drain the rest of the burst without yielding back to the event loop
+            for _ in range(self.batch_size - 1):
+                try:
+                    data, addr, reply = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                self._handle_safely(data, addr, reply)
+
+    def _handle_safely(self, data, addr, reply):
+        """Handles one message; an unexpected error is counted and logged, so one bad message
+        can never stop the consumer task (and with it all order intake)."""
+        try:
+            self._handle(data, addr, reply)
+        except Exception as e:
+            self.failed += 1
+            print(f"Error: Could not handle order message from {addr}: {e!r}")
+
+    def _handle(self, data, addr, reply):
+        self.received += 1
+        try:
+            orders = decode_orders(data) # Binary or JSON (see OrderProtocol)
+        except ValueError as e:
+            self.malformed += 1
+            print(f"Error: Received malformed order message from {addr}: {e}")
+            return
+
+        acks = []
+        for key, items in orders:
+            if key is not None:
+                order_id = self.dedup.get(key)
+                if order_id is not None:
+                    self.duplicates += 1
+                    acks.append((key, order_id))
+                    continue
+            try:
+                order_id = self.on_order(items)
+            except Exception as e:
+                print(f"Error in order listener: {e}")
+                order_id = None
+            if key is None:
+                continue
+            if order_id is None:
+                acks.append((key, REJECTED)) # Not cached: nothing was cooked, a resend is judged again
+            else:
+                self.dedup.add(key, order_id)
+                acks.append((key, order_id))
+
+        if acks:
+            reply(encode_ack(acks, binary=is_binary(data)), addr)
@@ -0,0 +1,197 @@
+# OrderProtocol.py
+import json
+import struct
+import uuid
+
+# Wire format shared by the ordering clients (GUI.py) and the kitchen's OrderIngestServer.
+#
+# UDP: one message per datagram.
+# TCP: a persistent stream of frames, each a 4-byte big-endian length followed by one message.
+#
+# A message is binary (below) or JSON. JSON messages are either a single order
+# {"orders": [item, ...], "key": key, ...} or a batch of orders {"batch": [{"orders": [...], "key": key}, ...]}.
+#
+# Binary messages start with BINARY_MAGIC, which can never start a JSON text:
+#   header  !BBH   magic, version, order count
+#   order   !QH    idempotency key (0: none), item count   (version 1: !H, item count only)
+#   item    !IBBBB item id, kind code, size/pasta code, sauce code (NO_CODE for pizza), topping count
+#           then one byte per topping code
+# Codes index the tuples below. Only append to them: a code must keep its meaning across versions.
+# Anything the tables cannot express (an unknown topping, a non-numeric id) is sent as JSON instead.
+#
+# Every order with an idempotency key (a client-generated 64-bit int) is acknowledged to the sender
+# in the format it used: binary ACK_MAGIC, version, count, then !QI (key, order id) per order, or
+# JSON {"acks": [[key, order_id], ...]}. A client resends until it gets the ack; the kitchen
+# recognises the key and acknowledges a resent order again without cooking it twice.
+# An order the kitchen rejects (no items, an invalid item) is acked with order id REJECTED, so the
+# client can report the rejection at once instead of resending it.
+
+UDP_PORT = 5004
+STREAM_PORT = 5005
+FRAME_HEADER = struct.Struct("!I")
+MAX_FRAME_SIZE = 16 * 1024 * 1024 # Larger frames are rejected and the connection is closed
+MAX_DATAGRAM_SIZE = 1400          # Messages above this go over TCP (fits one Ethernet frame)
+
+BINARY_MAGIC = 0xB5
+ACK_MAGIC = 0xB6
+WIRE_VERSION = 2
+SUPPORTED_VERSIONS = (1, 2)
+NO_CODE = 0xFF
+REJECTED = 0 # Order id of a negative ack; real order ids are never 0
+MAX_KEY = 2 ** 64 - 1 # Idempotency keys are 1..MAX_KEY (a binary order header holds 64 bits, 0 means none)
+
+ITEM_KINDS = ('pizza', 'pasta')
+PIZZA_SIZES = ('small', 'medium', 'large')
+PASTA_TYPES = ('spaghetti', 'penne', 'fettuccine', 'macaroni', 'gnocchi', 'tagliatelle')
+SAUCES = ('tomato', 'alfredo', 'pesto', 'bolognese', 'arrabiata', 'carbonara')
+TOPPINGS = ('pepperoni', 'mushrooms', 'onions', 'peppers', 'sausage', 'bacon', 'spinach',
+            'chicken', 'paprika', 'parmesan', 'basil', 'extra cheese', 'tuna', 'ham', 'pineapple',
+            'pepper', 'mushroom', 'onion')
+
+_MESSAGE_HEADER = struct.Struct("!BBH")
+_ORDER_HEADER = struct.Struct("!QH")
+_ORDER_HEADER_V1 = struct.Struct("!H")
+_ITEM_HEADER = struct.Struct("!IBBBB")
+_ACK_ENTRY = struct.Struct("!QI")
+
+_KIND_CODES = {name: code for code, name in enumerate(ITEM_KINDS)}
+_SIZE_CODES = {name: code for code, name in enumerate(PIZZA_SIZES)}
+_PASTA_CODES = {name: code for code, name in enumerate(PASTA_TYPES)}
+_SAUCE_CODES = {name: code for code, name in enumerate(SAUCES)}
+_TOPPING_CODES = {name: code for code, name in enumerate(TOPPINGS)}
+
+
+def new_idempotency_key():
+    """Random non-zero 64-bit key identifying one order across resends."""
+    return (uuid.uuid4().int >> 64) or 1
+
+
+def encode_message(message, binary=True):
+    """Serializes an order or batch message to bytes: binary when every item has a code, else JSON."""
+    if binary:
+        try:
+            return encode_binary(list(iter_orders(message)))
+        except (KeyError, IndexError, TypeError, ValueError, struct.error):
+            pass # Not expressible in the binary tables
+    return json.dumps(message).encode('utf-8')
+
+
+def encode_binary(orders):
+    """Packs a list of (key, items) orders into a binary message."""
+    parts = [_MESSAGE_HEADER.pack(BINARY_MAGIC, WIRE_VERSION, len(orders))]
+    for key, items in orders:
+        parts.append(_ORDER_HEADER.pack(key or 0, len(items)))
+        for item in items:
+            kind = item[1]
+            if kind == 'pizza':
+                variant, sauce, toppings = _SIZE_CODES[item[2]], NO_CODE, item[3:]
+            elif kind == 'pasta':
+                variant, sauce, toppings = _PASTA_CODES[item[2]], _SAUCE_CODES[item[3]], item[4:]
+            else:
+                raise ValueError(f"unknown item kind {kind!r}")
+            if not isinstance(item[0], int):
+                raise TypeError("binary item ids must be integers")
+            parts.append(_ITEM_HEADER.pack(item[0], _KIND_CODES[kind], variant, sauce, len(toppings)))
+            parts.append(bytes(_TOPPING_CODES[topping] for topping in toppings))
+    return b"".join(parts)
+
+
+def decode_orders(data):
+    """Returns (key, items) for every order in a binary or JSON message (key is None when not set).
+    Raises ValueError if the message is malformed or uses an unsupported version."""
+    if is_binary(data):
+        return _decode_binary(data)
+    return list(iter_orders(decode_message(data)))
+
+
+def _decode_binary(data):
+    try:
+        _, version, order_count = _MESSAGE_HEADER.unpack_from(data, 0)
+        if version not in SUPPORTED_VERSIONS:
+            raise ValueError(f"unsupported wire version {version}")
+        offset = _MESSAGE_HEADER.size
+        orders = []
+        for _ in range(order_count):
+            if version == 1:
+                key = None
+                (item_count,) = _ORDER_HEADER_V1.unpack_from(data, offset)
+                offset += _ORDER_HEADER_V1.size
+            else:
+                key, item_count = _ORDER_HEADER.unpack_from(data, offset)
+                offset += _ORDER_HEADER.size
+            items = []
+            for _ in range(item_count):
+                item_id, kind, variant, sauce, topping_count = _ITEM_HEADER.unpack_from(data, offset)
+                offset += _ITEM_HEADER.size
+                toppings = [TOPPINGS[code] for code in data[offset:offset + topping_count]]
+                if len(toppings) != topping_count:
+                    raise ValueError("truncated message")
+                offset += topping_count
+                if ITEM_KINDS[kind] == 'pizza':
+                    items.append([item_id, 'pizza', PIZZA_SIZES[variant]] + toppings)
+                else:
+                    items.append([item_id, 'pasta', PASTA_TYPES[variant], SAUCES[sauce]] + toppings)
+            orders.append((key or None, items))
+    except (struct.error, IndexError) as e:
+        raise ValueError(f"malformed binary message: {e}") from None
+    return orders
+
+
+def decode_message(data):
+    """Parses a JSON message. Raises ValueError if it is not valid JSON."""
+    return json.loads(data.decode('utf-8'))
+
+
+def encode_frame(payload):
+    """Length-prefixes an encoded message for the TCP stream."""
+    if len(payload) > MAX_FRAME_SIZE:
+        raise ValueError(f"Message of {len(payload)} bytes exceeds the {MAX_FRAME_SIZE}-byte frame limit")
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+
+def iter_orders(message):
+    """Yields (key, items) for every order in a single-order or batch JSON message.
+    Raises ValueError if the message has neither an 'orders' nor a 'batch' key, if
+    'batch' is not a list of orders or 'orders' is not a list, or if a key is not an
+    integer in 1..MAX_KEY."""
+    if isinstance(message, dict) and "batch" in message:
+        batch = message["batch"]
+        if not isinstance(batch, list) or not all(isinstance(order, dict) for order in batch):
+            raise ValueError("'batch' must be a list of orders")
+        for order in batch:
+            yield from iter_orders(order)
+    elif isinstance(message, dict) and "orders" in message:
+        if not isinstance(message["orders"], list):
+            raise ValueError("'orders' must be a list")
+        key = message.get("key")
+        if key is not None and (type(key) is not int or not 1 <= key <= MAX_KEY):
+            raise ValueError(f"invalid idempotency key {key!r}")
+        yield key, message["orders"]
+    else:
+        raise ValueError("missing 'orders' key")
+
+
+def is_binary(data):
+    return data[:1] == bytes((BINARY_MAGIC,))
+
+
+def encode_ack(acks, binary=True):
+    """Serializes (key, order_id) acknowledgements."""
+    if binary:
+        return (_MESSAGE_HEADER.pack(ACK_MAGIC, WIRE_VERSION, len(acks))
+                + b"".join(_ACK_ENTRY.pack(key, order_id) for key, order_id in acks))
+    return json.dumps({"acks": [[key, order_id] for key, order_id in acks]}).encode('utf-8')
+
+
+def decode_ack(data):
+    """Returns the (key, order_id) pairs of an ack message. Raises ValueError if it is not one."""
+    if data[:1] == bytes((ACK_MAGIC,)):
+        try:
+            _, _, count = _MESSAGE_HEADER.unpack_from(data, 0)
+            return [_ACK_ENTRY.unpack_from(data, _MESSAGE_HEADER.size + i * _ACK_ENTRY.size) for i in range(count)]
+        except struct.error as e:
+            raise ValueError(f"malformed ack: {e}") from None
+    message = decode_message(data)
+    if not isinstance(message, dict) or "acks" not in message:
+        raise ValueError("missing 'acks' key")
+    return [tuple(ack) for ack in message["acks"]]
@@ -0,0 +1,51 @@
+# OrderQueue.py
+from collections import OrderedDict
+
+
+class OrderQueue:
+    """
+    FIFO queue of Orders, indexed by OrderID.
+    Enqueue, dequeue, lookup and removal by order_id are all O(1). Per-state counts of
+    queued orders live in the OrderRegistry, which sees every lifecycle transition.
+    """
+
+    def __init__(self):
+        self._orders = OrderedDict() # order_id -> Order, in queue order
+
+    # --- Queue operations ---
+
+    def append(self, order):
+        """Adds an order at the back of the queue. Order ids must be unique."""
+        order_id = order.OrderID
+        if order_id in self._orders:
+            raise ValueError(f"Order {order_id} is already queued")
+        self._orders[order_id] = order
+
+    def popleft(self):
+        """Removes and returns the order at the front of the queue."""
+        if not self._orders:
+            raise IndexError("pop from an empty OrderQueue")
+        return self._orders.popitem(last=False)[1]
+
+    # --- Index operations ---
+
+    def get(self, order_id, default=None):
+        return self._orders.get(order_id, default)
+
+    def remove(self, order_id):
+        """Removes an order by id and returns it (None if it is not queued)."""
+        return self._orders.pop(order_id, None)
+
+    # --- Container protocol (keeps list-style call sites working) ---
+
+    def __len__(self):
+        return len(self._orders)
+
+    def __bool__(self):
+        return bool(self._orders)
+
+    def __iter__(self):
+        return iter(self._orders.values())
+
+    def __contains__(self, order_id):
+        return order_id in self._orders
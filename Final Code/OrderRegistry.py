@@ -0,0 +1,129 @@
+# OrderRegistry.py
+from collections import OrderedDict
+
+
+class OrderRegistry:
+    """
+    System-wide registry of active orders, kept up to date by lifecycle events from the
+    restaurants (received/queued, stage changes, item ready, delivered) instead of being
+    rebuilt by walking every restaurant's queues. Each active order has one status record
+    {'restaurant_name', 'order_id', 'customer_id', 'state', 'items_total', 'items_ready'};
+    per-restaurant and per-state counters are maintained on every event.
+
+    With track_changes, every event also marks the order as changed. drain_changes() hands the status UI only
+    those orders (a copy of the record, or None once delivered), so publishing costs
+    O(changed) rather than O(active orders).
+    """
+
+    QUEUED = 'QUEUED'
+
+    def __init__(self, track_changes=True):
+        self.track_changes = track_changes # False when nothing calls drain_changes() (headless runs)
+        self._records = {}            # order_id -> status record
+        self._by_restaurant = {}      # restaurant_name -> OrderedDict(order_id -> record), arrival order
+        self._state_counts = {}       # state -> active orders in that state
+        self._restaurant_counts = {}  # restaurant_name -> {state -> count}
+        self._changed = set()         # order ids changed since the last drain_changes()
+        self.delivered_count = 0
+
+    # --- Lifecycle events ---
+
+    def order_received(self, restaurant_name, order):
+        """An Order entered a restaurant's queue."""
+        order_id = order.OrderID
+        record = {
+            'restaurant_name': restaurant_name,
+            'order_id': order_id,
+            'customer_id': order.CustomerID,
+            'state': self.QUEUED,
+            'items_total': len(order.Products),
+            'items_ready': 0,
+        }
+        self._records[order_id] = record
+        self._by_restaurant.setdefault(restaurant_name, OrderedDict())[order_id] = record
+        self._count(record, 1)
+        self._mark_changed(order_id)
+
+    def order_stage(self, order_id, state):
+        """An order moved to a new stage (e.g. COOKING, PACKAGING, DELIVERING)."""
+        record = self._records.get(order_id)
+        if record is None or record['state'] == state:
+            return
+        self._count(record, -1)
+        record['state'] = state
+        self._count(record, 1)
+        self._mark_changed(order_id)
+
+    def item_ready(self, order_id):
+        """One item of an order finished cooking."""
+        record = self._records.get(order_id)
+        if record is None:
+            return
+        record['items_ready'] += 1
+        self._mark_changed(order_id)
+
+    def order_delivered(self, order_id):
+        """An order reached its customer and is no longer active."""
+        record = self._records.pop(order_id, None)
+        if record is None:
+            return
+        del self._by_restaurant[record['restaurant_name']][order_id]
+        self._count(record, -1)
+        self.delivered_count += 1
+        self._mark_changed(order_id)
+
+    def _mark_changed(self, order_id):
+        if self.track_changes:
+            self._changed.add(order_id)
+
+    def _count(self, record, delta):
+        state = record['state']
+        self._state_counts[state] = self._state_counts.get(state, 0) + delta
+        counts = self._restaurant_counts.setdefault(record['restaurant_name'], {})
+        counts[state] = counts.get(state, 0) + delta
+
+    # --- Queries ---
+
+    def get(self, order_id):
+        return self._records.get(order_id)
+
+    def state_count(self, state):
+        """Active orders in `state` across all restaurants. O(1)."""
+        return self._state_counts.get(state, 0)
+
+    def restaurant_counts(self, restaurant_name):
+        """{state: count} of one restaurant's active orders. O(1)."""
+        return self._restaurant_counts.get(restaurant_name, {})
+
+    def restaurant_orders(self, restaurant_name):
+        """Status records of one restaurant's active orders, oldest first."""
+        return list(self._by_restaurant.get(restaurant_name, {}).values())
+
+    def active_orders(self):
+        """Status records of every active order."""
+        return list(self._records.values())
+
+    def has_changes(self):
+        return bool(self._changed)
+
+    def stop_tracking(self):
+        """Stops change tracking and drops pending changes (the status UI is gone or never started)."""
+        self.track_changes = False
+        self._changed.clear()
+
+    def drain_changes(self):
+        """Returns {order_id: record copy, or None if the order is no longer active} for every order
+        changed since the last call. The copies are safe to hand to another thread."""
+        records = self._records
+        changes = {}
+        for order_id in self._changed:
+            record = records.get(order_id)
+            changes[order_id] = dict(record) if record is not None else None
+        self._changed.clear()
+        return changes
+
+    def __len__(self):
+        return len(self._records)
+
+    def __contains__(self, order_id):
+        return order_id in self._records
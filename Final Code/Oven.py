@@ -1,31 +1,42 @@
 # Oven.py
-import time
 import random
 
 class Oven:
-    def __init__(self, screen):
+    def __init__(self, screen, scheduler, clock):
         self.screen = screen # For visualization
+        self.scheduler = scheduler # Event scheduler used for the bake-done event
+        self.clock = clock # Simulation clock (real, scaled or virtual)
         self.Available = True
         self.cooking_item = None
         self.chef_reference = None
+        self.order = None # Order the pizza in the oven belongs to
         self.bake_end_time = 0
         self.bake_time = 5 # seconds
 
-    def bake_pizza(self, restaurant, chef, pizza_item):
+    def bake_pizza(self, restaurant, chef, pizza, order):
         """Receives Pizza from Chef (Sequence Diagram)."""
         self.Available = False
         self.chef_reference = chef
-        self.cooking_item = pizza_item
-        self.bake_end_time = time.time() + self.bake_time
-        print(f"[Oven] Started baking Pizza {pizza_item[0]}. Ready in {self.bake_time}s.")
+        self.cooking_item = pizza
+        self.order = order
+        pizza.set_status("baking")
+        self.bake_end_time = self.clock.now() + self.bake_time
+        self.scheduler.schedule_at(self.bake_end_time, self.finish_baking, restaurant)
+        print(f"[Oven] Started baking Pizza {pizza.PizzaID}. Ready in {self.bake_time}s.")
 
-    def update(self, restaurant):
-        if not self.Available and time.time() >= self.bake_end_time:
-            # Update Pizza Status (Sequence Diagram - dashed line to Chef)
-            item_name = self.cooking_item[0]
-            self.chef_reference.receive_cooking_status(restaurant, 'done', item_name, 'pizza')
-            
-            print(f"[Oven] Finished baking Pizza {item_name}.")
-            self.Available = True
-            self.cooking_item = None
-            self.chef_reference = None
\ No newline at end of file
+    def finish_baking(self, restaurant):
+        """Bake-done event, fired by the scheduler when the bake timer expires."""
+        item = self.cooking_item
+        chef, order = self.chef_reference, self.order
+        item.set_status("done")
+        print(f"[Oven] Finished baking Pizza {item.PizzaID}.")
+
+        # Free the oven first; the pool hands it straight to the next waiting pizza
+        self.Available = True
+        self.cooking_item = None
+        self.chef_reference = None
+        self.order = None
+        restaurant.OvenPool.release(self)
+
+        # Update Pizza Status (Sequence Diagram - dashed line to Chef)
+        chef.receive_cooking_status(restaurant, 'done', item, order)
@@ -1,31 +1,42 @@
 # Pan.py
-import time
 import random
 
 class Pan:
-    def __init__(self, screen):
+    def __init__(self, screen, scheduler, clock):
         self.screen = screen # For visualization
+        self.scheduler = scheduler # Event scheduler used for the cook-done event
+        self.clock = clock # Simulation clock (real, scaled or virtual)
         self.Available = True
         self.cooking_item = None
         self.chef_reference = None
+        self.order = None # Order the pasta in the pan belongs to
         self.cook_end_time = 0
         self.cook_time = 4 # seconds
 
-    def cook_pasta(self, restaurant, chef, pasta_item):
+    def cook_pasta(self, restaurant, chef, pasta, order):
         """Receives Pasta from Chef (Sequence Diagram)."""
         self.Available = False
         self.chef_reference = chef
-        self.cooking_item = pasta_item
-        self.cook_end_time = time.time() + self.cook_time
-        print(f"[Pan] Started cooking Pasta {pasta_item[0]}. Ready in {self.cook_time}s.")
+        self.cooking_item = pasta
+        self.order = order
+        pasta.set_status("cooking")
+        self.cook_end_time = self.clock.now() + self.cook_time
+        self.scheduler.schedule_at(self.cook_end_time, self.finish_cooking, restaurant)
+        print(f"[Pan] Started cooking Pasta {pasta.PastaID}. Ready in {self.cook_time}s.")
 
-    def update(self, restaurant):
-        if not self.Available and time.time() >= self.cook_end_time:
-            # Update Pasta Status (Sequence Diagram - dashed line to Chef)
-            item_name = self.cooking_item[0]
-            self.chef_reference.receive_cooking_status(restaurant, 'done', item_name, 'pasta')
+    def finish_cooking(self, restaurant):
+        """Cook-done event, fired by the scheduler when the cook timer expires."""
+        item = self.cooking_item
+        chef, order = self.chef_reference, self.order
+        item.set_status("done")
+        print(f"[Pan] Finished cooking Pasta {item.PastaID}.")
 
-            print(f"[Pan] Finished cooking Pasta {item_name}.")
-            self.Available = True
-            self.cooking_item = None
-            self.chef_reference = None
\ No newline at end of file
+        # Free the pan first; the pool hands it straight to the next waiting pasta
+        self.Available = True
+        self.cooking_item = None
+        self.chef_reference = None
+        self.order = None
+        restaurant.PanPool.release(self)
+
+        # Update Pasta Status (Sequence Diagram - dashed line to Chef)
+        chef.receive_cooking_status(restaurant, 'done', item, order)
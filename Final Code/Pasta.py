@@ -1,29 +1,28 @@
 # Pasta.py
+from MenuCatalog import get_catalog, PASTA
+
 class Pasta:
+    __slots__ = ('PastaID', 'PastaType', 'Sauce', 'Toppings', 'Status', 'MenuCode', 'Price')
+    Type = 'pasta'
+    KindCode = PASTA
+
     def __init__(self, item_data):
         # item_data format: [pasta_id, 'pasta', pasta_type, sauce, topping1, topping2, ...]
         self.PastaID = item_data[0]
-        self.Type = 'pasta'
         self.PastaType = item_data[2]
         self.Sauce = item_data[3]
-        self.Toppings = item_data[4:] if len(item_data) > 4 else []
+        self.Toppings = tuple(item_data[4:])
         self.Status = "pending"
+        self.MenuCode = get_catalog().pasta_code(self.PastaType, self.Sauce, len(self.Toppings)) # See MenuCatalog.item_code
         self.Price = self.CalculatePrice()
 
     def CalculatePrice(self):
-        """Calculate price compatible with your existing system"""
-        base_prices = {
-            'spaghetti': 12, 'penne': 11, 'fettuccine': 13,
-            'macaroni': 10, 'gnocchi': 14, 'tagliatelle': 13
-        }
-        base_price = base_prices.get(self.PastaType, 12)
-
-        sauce_prices = {'alfredo': 2, 'pesto': 1, 'bolognese': 2, 'carbonara': 3}
-        sauce_price = sauce_prices.get(self.Sauce, 0)
-
-        toppings_price = len(self.Toppings) * 1.0
+        """Calculate price from the menu catalog (pasta price + sauce price + price per topping)"""
+        return get_catalog().item_price(self.MenuCode)
 
-        return base_price + sauce_price + toppings_price
+    @property
+    def ItemID(self):
+        return self.PastaID
 
     def GetPrice(self):
         return self.Price
@@ -45,4 +44,4 @@ class Pasta:
 
     def to_list_format(self):
         """Convert back to your list format for compatibility"""
-        return [self.PastaID, 'pasta', self.PastaType, self.Sauce] + self.Toppings
\ No newline at end of file
+        return [self.PastaID, 'pasta', self.PastaType, self.Sauce, *self.Toppings]
\ No newline at end of file
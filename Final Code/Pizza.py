@@ -1,21 +1,28 @@
 # Pizza.py
+from MenuCatalog import get_catalog, PIZZA
+
 class Pizza:
+    __slots__ = ('PizzaID', 'Size', 'Toppings', 'Status', 'bakingTime', 'MenuCode', 'Price')
+    Type = 'pizza'
+    KindCode = PIZZA
+
     def __init__(self, item_data):
         # item_data format: [pizza_id, 'pizza', size, topping1, topping2, ...]
         self.PizzaID = item_data[0]
-        self.Type = 'pizza'
         self.Size = item_data[2]
-        self.Toppings = item_data[3:] if len(item_data) > 3 else []
+        self.Toppings = tuple(item_data[3:])
         self.Status = "pending"
         self.bakingTime = 5
+        self.MenuCode = get_catalog().pizza_code(self.Size, len(self.Toppings)) # See MenuCatalog.item_code
         self.Price = self.CalculatePrice()
 
     def CalculatePrice(self):
-        """Calculate price compatible with your existing system"""
-        base_prices = {'small': 10, 'medium': 15, 'large': 20}
-        base_price = base_prices.get(self.Size, 15)
-        toppings_price = len(self.Toppings) * 1.5
-        return base_price + toppings_price
+        """Calculate price from the menu catalog (size price + price per topping)"""
+        return get_catalog().item_price(self.MenuCode)
+
+    @property
+    def ItemID(self):
+        return self.PizzaID
 
     def GetPrice(self):
         return self.Price
@@ -43,4 +50,4 @@ class Pizza:
 
     def to_list_format(self):
         """Convert back to your list format for compatibility"""
-        return [self.PizzaID, 'pizza', self.Size] + self.Toppings
\ No newline at end of file
+        return [self.PizzaID, 'pizza', self.Size, *self.Toppings]
\ No newline at end of file
@@ -0,0 +1,85 @@
+# RoutingPolicy.py
+import math
+
+
+class NearestRestaurantPolicy:
+    """Routes every order to the restaurant closest to the customer (straight-line distance)."""
+
+    name = "nearest"
+
+    def choose_restaurant(self, system, customer_coords, order):
+        return system.city.find_nearest_restaurant(customer_coords)
+
+
+class PredictedDeliveryPolicy:
+    """
+    Routes every order to the candidate restaurant with the lowest predicted delivery time:
+    kitchen wait (queue length and chef/oven/pan availability from get_restaurant_stats)
+    + cooking time of the order itself + wait for a drone + the drone's flight to the customer.
+    Only the `candidates` nearest restaurants are scored, so routing stays O(log n).
+    """
+
+    name = "predicted"
+
+    def __init__(self, candidates=5):
+        self.candidates = candidates
+
+    def choose_restaurant(self, system, customer_coords, order):
+        best_restaurant, best_position, best_eta = None, None, float('inf')
+        for _, position, restaurant in system.city.find_nearest_restaurants(customer_coords, self.candidates):
+            eta = self.predict_delivery_time(system, restaurant, position, customer_coords, order)
+            if eta < best_eta:
+                best_restaurant, best_position, best_eta = restaurant, position, eta
+        return best_restaurant, best_position
+
+    def predict_delivery_time(self, system, restaurant, position, customer_coords, order):
+        """Predicted seconds from now until the order reaches the customer."""
+        stats = restaurant.get_restaurant_stats()
+        bake_time = restaurant.Ovens[0].bake_time if restaurant.Ovens else 0
+        cook_time = restaurant.Pans[0].cook_time if restaurant.Pans else 0
+
+        # 1. Kitchen: orders ahead of this one share the chefs, items already waiting share the equipment
+        order_time = max(bake_time, cook_time)
+        chef_wait = 0
+        if stats['total_chefs']:
+            orders_ahead = stats['queue_size'] + stats['total_chefs'] - stats['available_chefs']
+            chef_wait = max(0, orders_ahead - stats['total_chefs'] + 1) * order_time / stats['total_chefs']
+        else:
+            chef_wait = float('inf')
+        equipment_wait = 0
+        if stats['total_ovens']:
+            equipment_wait = max(equipment_wait, stats['waiting_pizzas'] * bake_time / stats['total_ovens'])
+        if stats['total_pans']:
+            equipment_wait = max(equipment_wait, stats['waiting_pastas'] * cook_time / stats['total_pans'])
+
+        # 2. This order's own cooking time
+        item_types = {item.Type for item in order.Products}
+        own_cook_time = max(bake_time if 'pizza' in item_types else 0,
+                            cook_time if 'pasta' in item_types else 0)
+
+        # 3. Delivery: wait for a drone, then fly out
+        flight_time, drone_wait = self._drone_eta(system, restaurant, position, customer_coords, stats)
+
+        return chef_wait + equipment_wait + own_cook_time + drone_wait + flight_time
+
+    def _drone_eta(self, system, restaurant, position, customer_coords, stats):
+        """Returns (one-way flight time, expected wait until the fleet has a drone at the restaurant)."""
+        fleet = system.fleet
+        if not fleet.drones:
+            return float('inf'), float('inf')
+
+        flight_time = math.hypot(customer_coords[0] - position[0], customer_coords[1] - position[1]) / fleet.drones[0].speed
+        return flight_time, fleet.estimate_wait(position)
+
+
+ROUTING_POLICIES = {
+    NearestRestaurantPolicy.name: NearestRestaurantPolicy,
+    PredictedDeliveryPolicy.name: PredictedDeliveryPolicy,
+}
+
+
+def create_routing_policy(name):
+    """Builds a routing policy by name ('nearest' or 'predicted')."""
+    if name not in ROUTING_POLICIES:
+        raise ValueError(f"Unknown routing policy: {name}")
+    return ROUTING_POLICIES[name]()
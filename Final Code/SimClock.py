@@ -0,0 +1,67 @@
+# SimClock.py
+import time
+
+
+class RealTimeClock:
+    """Simulated time == wall-clock time (the original behaviour)."""
+
+    def now(self):
+        return time.time()
+
+    def seconds_until(self, timestamp):
+        """Wall-clock seconds until simulated time reaches timestamp."""
+        return timestamp - self.now()
+
+
+class ScaledClock:
+    """Simulated time runs `scale` times faster than wall-clock time (e.g. 100x)."""
+
+    def __init__(self, scale):
+        if scale <= 0:
+            raise ValueError(f"Clock scale must be positive, got {scale}")
+        self.scale = scale
+        self.start_time = time.time() # Simulated time starts at the current wall-clock time
+        self._start_monotonic = time.monotonic()
+
+    def now(self):
+        return self.start_time + (time.monotonic() - self._start_monotonic) * self.scale
+
+    def seconds_until(self, timestamp):
+        """Wall-clock seconds until simulated time reaches timestamp."""
+        return (timestamp - self.now()) / self.scale
+
+
+class VirtualClock:
+    """
+    Fully virtual time that only moves when the simulation advances it.
+    Either in fixed steps (advance) or straight to the next event (advance_to),
+    so runs are deterministic and independent of CPU speed.
+    """
+
+    def __init__(self, start_time=0.0, step_size=1 / 30):
+        self.current_time = start_time
+        self.step_size = step_size # Seconds added by step()
+
+    def now(self):
+        return self.current_time
+
+    def advance(self, seconds):
+        self.current_time += seconds
+
+    def advance_to(self, timestamp):
+        if timestamp > self.current_time:
+            self.current_time = timestamp
+
+    def step(self):
+        self.advance(self.step_size)
+
+
+def create_clock(mode="real", scale=1.0, step_size=1 / 30):
+    """Builds a clock for the given mode: 'real', 'scaled' or 'virtual'."""
+    if mode == "real":
+        return RealTimeClock()
+    if mode == "scaled":
+        return ScaledClock(scale)
+    if mode == "virtual":
+        return VirtualClock(step_size=step_size)
+    raise ValueError(f"Unknown clock mode: {mode}")
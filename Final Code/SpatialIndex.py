@@ -0,0 +1,146 @@
+# SpatialIndex.py
+import heapq
+import math
+
+
+class KDTree:
+    """
+    Static 2-D k-d tree over (x, y) points, each with an attached payload
+    (e.g. a restaurant). Built once in O(n log n); nearest-neighbour queries
+    are O(log n) on average instead of a linear scan.
+    """
+
+    def __init__(self, points, payloads):
+        entries = list(zip(points, payloads))
+        self._root = self._build(entries, depth=0)
+        self._size = len(entries)
+
+    def _build(self, entries, depth):
+        if not entries:
+            return None
+        axis = depth % 2
+        entries.sort(key=lambda entry: entry[0][axis])
+        median = len(entries) // 2
+        point, payload = entries[median]
+        # Node layout: [point, payload, axis, left, right]
+        return [point, payload, axis,
+                self._build(entries[:median], depth + 1),
+                self._build(entries[median + 1:], depth + 1)]
+
+    def nearest(self, query, k=1):
+        """Returns up to k (distance, point, payload) tuples, closest first."""
+        if self._root is None or k <= 0:
+            return []
+
+        qx, qy = query
+        best = [] # Max-heap (negated distances) of the k best so far
+        tie_breaker = 0
+        stack = [(self._root, 0.0)] # (node, distance from the query to the node's region)
+        while stack:
+            node, bound = stack.pop()
+            if node is None or (len(best) == k and bound >= -best[0][0]):
+                continue # Region cannot contain anything closer than the current k-th best
+            point, payload, axis, left, right = node
+            distance = math.hypot(qx - point[0], qy - point[1])
+            if len(best) < k:
+                heapq.heappush(best, (-distance, tie_breaker, point, payload))
+                tie_breaker += 1
+            elif distance < -best[0][0]:
+                heapq.heapreplace(best, (-distance, tie_breaker, point, payload))
+                tie_breaker += 1
+
+            # Push the far side first so the near side is searched first; the far
+            # side is pruned when popped if the splitting line is already too far away.
+            diff = (qx if axis == 0 else qy) - point[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            stack.append((far, max(bound, abs(diff))))
+            stack.append((near, bound))
+
+        return [(-neg_distance, point, payload)
+                for neg_distance, _, point, payload in sorted(best, key=lambda entry: (-entry[0], entry[1]))]
+
+    def __len__(self):
+        return self._size
+
+
+class SpatialGrid:
+    """
+    Dynamic uniform grid of items by (x, y) position (e.g. idle drones).
+    Insert and remove are O(1); nearest() searches rings of cells outwards from
+    the query and stops as soon as no unvisited cell can hold anything closer,
+    which is effectively constant time for a city-sized map.
+    """
+
+    def __init__(self, cell_size=100):
+        self.cell_size = cell_size
+        self._cells = {}   # (cell_x, cell_y) -> {item: (x, y)}
+        self._cell_of = {} # item -> (cell_x, cell_y)
+        self._bounds = None # (min_cx, min_cy, max_cx, max_cy) of every cell ever used
+
+    def _cell(self, position):
+        return int(position[0] // self.cell_size), int(position[1] // self.cell_size)
+
+    def insert(self, item, position):
+        if item in self._cell_of:
+            self.remove(item)
+        cell = self._cell(position)
+        self._cells.setdefault(cell, {})[item] = position
+        self._cell_of[item] = cell
+        if self._bounds is None:
+            self._bounds = (cell[0], cell[1], cell[0], cell[1])
+        else:
+            min_cx, min_cy, max_cx, max_cy = self._bounds
+            self._bounds = (min(min_cx, cell[0]), min(min_cy, cell[1]), max(max_cx, cell[0]), max(max_cy, cell[1]))
+
+    def remove(self, item):
+        cell = self._cell_of.pop(item, None)
+        if cell is None:
+            return False
+        bucket = self._cells[cell]
+        del bucket[item]
+        if not bucket:
+            del self._cells[cell]
+        return True
+
+    def nearest(self, position):
+        """Returns (distance, item, item_position) of the closest item, or None if the grid is empty."""
+        if not self._cell_of:
+            return None
+
+        qx, qy = position
+        center_x, center_y = self._cell(position)
+        min_cx, min_cy, max_cx, max_cy = self._bounds
+        max_ring = max(abs(center_x - min_cx), abs(center_x - max_cx), abs(center_y - min_cy), abs(center_y - max_cy))
+
+        best = None
+        for ring in range(max_ring + 1):
+            # Everything in this ring is at least (ring - 1) cells away from the query
+            if best is not None and best[0] <= (ring - 1) * self.cell_size:
+                break
+            for cell in self._ring_cells(center_x, center_y, ring):
+                bucket = self._cells.get(cell)
+                if not bucket:
+                    continue
+                for item, (x, y) in bucket.items():
+                    distance = math.hypot(qx - x, qy - y)
+                    if best is None or distance < best[0]:
+                        best = (distance, item, (x, y))
+        return best
+
+    @staticmethod
+    def _ring_cells(center_x, center_y, ring):
+        if ring == 0:
+            yield center_x, center_y
+            return
+        for dx in range(-ring, ring + 1):
+            yield center_x + dx, center_y - ring
+            yield center_x + dx, center_y + ring
+        for dy in range(-ring + 1, ring):
+            yield center_x - ring, center_y + dy
+            yield center_x + ring, center_y + dy
+
+    def __len__(self):
+        return len(self._cell_of)
+
+    def __contains__(self, item):
+        return item in self._cell_of
@@ -0,0 +1,49 @@
+# TextCache.py
+from collections import OrderedDict
+
+
+class TextCache:
+    """
+    Shared cache of rendered text surfaces for the pygame drawing code.
+    Surfaces are keyed by (font, text, colour, background), so a label that did not
+    change since the last frame costs a dictionary lookup and a blit instead of a
+    glyph rasterization. Entries are kept in least-recently-used order and the
+    oldest are evicted beyond max_entries, which bounds memory while drone labels
+    and counters keep producing new strings.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._surfaces = OrderedDict() # (font, text, colour, background) -> Surface
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, colour, background=None):
+        """Same as font.render(text, True, colour, background), served from the cache when possible.
+        The returned surface is shared: blit it, do not draw on it."""
+        key = (font, text, colour, background)
+        surface = self._surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        if background is None:
+            surface = font.render(text, True, colour)
+        else:
+            surface = font.render(text, True, colour, background)
+        self._surfaces[key] = surface
+        if len(self._surfaces) > self.max_entries:
+            self._surfaces.popitem(last=False)
+        return surface
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        self._surfaces.clear()
+
+    def __len__(self):
+        return len(self._surfaces)
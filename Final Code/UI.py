@@ -1,7 +1,7 @@
 # UI.py
 
 import tkinter as tk
-from tkinter import Canvas, Scrollbar, Frame
+from tkinter import Canvas, Scrollbar
 import threading
 import time
 from enum import Enum
@@ -23,23 +23,34 @@ class TkinterThread(threading.Thread):
     to prevent GIL conflicts with the Pygame thread.
     """
 
-    def __init__(self, system_reference):
+    def __init__(self, system_reference, max_publish_rate=10):
         super().__init__(daemon=True)
         self.system = system_reference
         self.root = None
         self.status_ui = None
         self._is_running = False
+        self.ready = threading.Event() # Set once the UI objects exist (or Tk failed to start)
+
+        # Coalescing status channel: at most one delivery is ever pending on the Tk thread
+        self.min_publish_interval = 1.0 / max_publish_rate if max_publish_rate else 0.0
+        self._pending_changes = {} # order_id -> latest status (None: no longer active), not yet delivered
+        self._pending_lock = threading.Lock()
+        self._publish_pending = False
+        self._last_delivery_time = 0.0
 
     def run(self):
         """Called when the thread starts."""
-        self.root = tk.Tk()
-        self.root.withdraw()
+        try:
+            self.root = tk.Tk()
+            self.root.withdraw()
 
-        self.status_ui = OrderStatusUI(self.system, self.root)
+            self.status_ui = OrderStatusUI(self.system, self.root)
 
-        self._is_running = True
+            self._is_running = True
 
-        self.root.title("System UI & Controls")
+            self.root.title("System UI & Controls")
+        finally:
+            self.ready.set() # Never leave the simulation waiting, even if Tk could not start
 
         # Start the Tkinter event loop
         try:
@@ -49,10 +60,36 @@ class TkinterThread(threading.Thread):
         finally:
             self.stop()
 
-    def schedule_status_update(self, order_statuses):
-        """Schedules a status update to run safely on the Tkinter thread."""
-        if self._is_running and self.root and self.status_ui.root:
-            self.root.after(0, lambda: self.status_ui.update_status(order_statuses))
+    def is_running(self):
+        """True while the Tk event loop runs (False before it started, if Tk failed, or after stop())."""
+        return self._is_running
+
+    def can_publish(self):
+        """False while a delivery is still pending; the caller can keep accumulating changes
+        and publish them together once the pending delivery has run."""
+        return self._is_running and not self._publish_pending
+
+    def publish_status(self, order_changes):
+        """Publishes {order_id: status or None} changes (called from the simulation thread).
+        Changes are merged into the undelivered ones, newer values replacing older, and
+        deliveries are spaced at least min_publish_interval apart, so Tk callbacks can never pile up."""
+        if not (self._is_running and self.root and self.status_ui.root):
+            return
+        with self._pending_lock:
+            self._pending_changes.update(order_changes)
+        if self._publish_pending:
+            return
+        self._publish_pending = True
+        delay = self._last_delivery_time + self.min_publish_interval - time.monotonic()
+        self.root.after(max(int(delay * 1000), 0), self._deliver_status)
+
+    def _deliver_status(self):
+        """Runs on the Tk thread: applies every change published since the last delivery."""
+        self._publish_pending = False # Cleared first: a publish racing with this delivery schedules a new one
+        with self._pending_lock:
+            order_changes, self._pending_changes = self._pending_changes, {}
+        self._last_delivery_time = time.monotonic()
+        self.status_ui.update_status(order_changes)
 
     def stop(self):
         """Stops the Tkinter event loop gracefully."""
@@ -63,18 +100,39 @@ class TkinterThread(threading.Thread):
 
 
 # =========================================================================
-# OrderStatusUI (Collapsible Accordion View)
+# OrderStatusUI (Collapsible Accordion View, virtualized)
 # =========================================================================
 class OrderStatusUI:
+    """
+    Status window listing every active order, grouped in collapsible per-restaurant sections.
+    It receives only the orders that changed (see OrderRegistry.drain_changes) and keeps its own
+    copy of the statuses, plus one list of order ids per section, both updated per change.
+    The list is virtualized: rows are addressed by index through the section sizes, and the
+    canvas holds a small pool of row slots (canvas items) sized to the viewport. Only the rows
+    in view are formatted and drawn, and scrolling re-assigns the slots to the rows now in view,
+    so the cost of an update depends on the changes and the window height, not on the number of orders.
+    """
+
+    ROW_HEIGHT = 24
+    ROW_STYLES = {
+        # kind: (font, text colour, background)
+        'title': (("Arial", 14, "bold"), 'black', '#F0F0F0'),
+        'header': (("Arial", 11, "bold"), 'white', '#A9A9A9'),
+        'order': (("Courier", 10), 'black', 'white'),
+        'empty': (("Arial", 10), 'black', 'white'),
+    }
+
     def __init__(self, system_reference, main_tk_root):
         self.system = system_reference
         self.root = None
         self.main_tk_root = main_tk_root
         self.expansion_states = {}
-        self.content_frame = None
         self.canvas = None
-        # Member for flicker fix (data comparison)
-        self.last_active_orders_hash = None
+        self.scrollbar = None
+        self.restaurants_orders = {} # rest_name -> {order_id: status}, in arrival order
+        self.order_restaurants = {}  # order_id -> rest_name, to find the section of a finished order
+        self.section_ids = {}        # rest_name -> [order_id, ...], the order rows of the section in order
+        self.slots = []              # Recycled canvas items: {'bg', 'text', 'sep', 'row'}
 
         self.start_ui()
 
@@ -87,146 +145,177 @@ class OrderStatusUI:
         self.root.geometry("450x700")
 
         # Canvas setup for scrollability
-        self.canvas = Canvas(self.root, borderwidth=0, background="#F0F0F0")
+        self.canvas = Canvas(self.root, borderwidth=0, background="#F0F0F0", highlightthickness=0)
         self.canvas.pack(side="left", fill="both", expand=True)
 
-        scrollbar = Scrollbar(self.root, orient="vertical", command=self.canvas.yview)
-        scrollbar.pack(side="right", fill="y")
-
-        self.canvas.configure(yscrollcommand=scrollbar.set)
-
-        # Frame to hold the actual content inside the canvas
-        self.content_frame = Frame(self.canvas, background="#F0F0F0")
-        # Ensure the content frame fills the width
-        self.canvas.create_window((0, 0), window=self.content_frame, anchor="nw",
-                                  width=450 - scrollbar.winfo_reqwidth())
+        self.scrollbar = Scrollbar(self.root, orient="vertical", command=self._on_scroll)
+        self.scrollbar.pack(side="right", fill="y")
 
-        self.content_frame.bind("<Configure>", lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
+        self.canvas.configure(yscrollcommand=self.scrollbar.set)
+        self.canvas.bind("<Configure>", lambda e: self._render())
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<MouseWheel>", lambda e: self._on_scroll("scroll", -1 if e.delta > 0 else 1, "units"))
+        self.canvas.bind("<Button-4>", lambda e: self._on_scroll("scroll", -1, "units"))
+        self.canvas.bind("<Button-5>", lambda e: self._on_scroll("scroll", 1, "units"))
 
         # Draw initial content
-        self.update_status([])
+        self.update_status({})
         self.root.deiconify()
 
-    def toggle_orders_view(self, rest_name, header_button, order_frame_reference):
-        """Toggle the expansion state of a restaurant's order list."""
-
-        is_expanded = self.expansion_states.get(rest_name, False)
-
-        if is_expanded:
-            order_frame_reference.pack_forget()
-            header_button.config(text=header_button.cget("text").replace("▼", "►"))
-        else:
-            order_frame_reference.pack(fill='x', padx=0, pady=(0, 0))
-            header_button.config(text=header_button.cget("text").replace("►", "▼"))
-
-        self.expansion_states[rest_name] = not is_expanded
-
-        self.content_frame.update_idletasks()
-        self.canvas.config(scrollregion=self.canvas.bbox("all"))
-
-    def update_status(self, orders_data):
-        """Updates the default ALL_ACTIVE view."""
-        if not self.root or not self.content_frame or not self.root.winfo_exists():
-            return
+    def _on_scroll(self, *args):
+        """Scrollbar/mouse-wheel handler: scrolls the canvas, then re-assigns slots to the rows in view."""
+        self.canvas.yview(*args)
+        self._render()
 
-        # 1. Create a hash of the current order data for comparison (Flicker Fix)
-        hashable_data = []
-        for order in orders_data:
-            # Tuple: (restaurant_name, order_id, state)
-            hashable_data.append((order.get('restaurant_name'), order.get('order_id'), order.get('state')))
+    def _on_click(self, event):
+        """Clicking a restaurant header toggles its section."""
+        index = int(self.canvas.canvasy(event.y) // self.ROW_HEIGHT)
+        for _, kind, key in self._iter_rows(index, index + 1):
+            if kind == 'header':
+                self.toggle_orders_view(key)
 
-        hashable_data.sort()
-        current_data_hash = hash(tuple(hashable_data))
-
-        # 2. Check if the layout/state has changed since the last update
-        if current_data_hash == self.last_active_orders_hash:
-            # Only data inside the expanded frames (items_ready) would change.
-            return
-
-        self.last_active_orders_hash = current_data_hash
-
-        # 3. Clear existing content
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
-
-        # Title for All Active View
-        tk.Label(self.content_frame, text="Active Orders (System-Wide)",
-                 font=("Arial", 14, "bold"), bg='#F0F0F0').pack(fill='x', padx=5, pady=5)
+    def toggle_orders_view(self, rest_name):
+        """Toggle the expansion state of a restaurant's order list."""
+        self.expansion_states[rest_name] = not self.expansion_states.get(rest_name, False)
+        self._render()
 
-        if not orders_data:
-            tk.Label(self.content_frame, text="No active orders in the kitchen queue or in transit.", bg='white',
-                     font=("Arial", 10)).pack(pady=20)
-            self.content_frame.update_idletasks()
-            self.canvas.config(scrollregion=self.canvas.bbox("all"))
+    def update_status(self, order_changes):
+        """Applies {order_id: status, or None once the order is no longer active} to the ALL_ACTIVE
+        view. Work is proportional to the changes; Tk items are touched for the visible rows alone."""
+        if not self.root or not self.canvas or not self.root.winfo_exists():
             return
 
-        # 4. Group orders by restaurant
-        restaurants_orders = {}
-        for order in orders_data:
+        restaurants_orders = self.restaurants_orders
+        order_restaurants = self.order_restaurants
+        section_ids = self.section_ids
+        finished = {} # rest_name -> ids of its orders that are no longer active
+        for order_id, order in order_changes.items():
+            if order is None:
+                rest_name = order_restaurants.pop(order_id, None)
+                orders = restaurants_orders.get(rest_name)
+                if orders is not None and orders.pop(order_id, None) is not None:
+                    finished.setdefault(rest_name, []).append(order_id)
+                continue
             rest_name = order.get('restaurant_name', 'Unknown Restaurant')
-            if rest_name not in restaurants_orders:
-                restaurants_orders[rest_name] = []
-            restaurants_orders[rest_name].append(order)
-
-        # 5. Create a collapsible section for each restaurant
-        for rest_name, orders in restaurants_orders.items():
-            order_count = len(orders)
-            is_expanded = self.expansion_states.get(rest_name, False)
-
-            rest_frame = tk.Frame(self.content_frame, bg='#E0E0E0', padx=0, pady=0)
-            rest_frame.pack(fill='x', padx=5, pady=(5, 0))
-
-            order_details_frame = tk.Frame(rest_frame, bg='#FFFFFF', bd=1, relief=tk.SOLID)
-
-            button_indicator = "▼" if is_expanded else "►"
-            button_text = f"{button_indicator} {rest_name} ({order_count} Orders)"
-
-            header_button = tk.Button(
-                rest_frame,
-                text=button_text,
-                font=("Arial", 11, "bold"),
-                bg="#A9A9A9", fg="white",
-                activebackground="#909090",
-                anchor='w',
-                relief='flat',
-                padx=5,
-            )
-
-            
-            header_button.config(
-                command=lambda name=rest_name, btn=header_button, details=order_details_frame: self.toggle_orders_view(
-                    name, btn, details)
-            )
-
-            header_button.pack(fill='x')
-
-            if is_expanded:
-                order_details_frame.pack(fill='x', padx=0, pady=(0, 0))
-
-                # Populate the order details frame
-            for i, order in enumerate(orders):
-                order_id = order.get('order_id', 'N/A')
-                state = order.get('state', 'Unknown')
-                items_total = order.get('items_total', 0)
-                items_ready = order.get('items_ready', 0)
-
-                status_text = f"ID: {order_id} | Status: {state} | Items: {items_ready}/{items_total} Ready"
-
-                order_label = tk.Label(
-                    order_details_frame,
-                    text=status_text,
-                    font=("Courier", 10),
-                    bg='white',
-                    fg='black',
-                    anchor='w',
-                    padx=10,
-                    pady=2
-                )
-                order_label.pack(fill='x')
-
-                if i < order_count - 1:
-                    tk.Frame(order_details_frame, height=1, bg='#CCCCCC').pack(fill='x', padx=10)
-
-                    # 6. Final canvas update for scrolling
-        self.content_frame.update_idletasks()
-        self.canvas.config(scrollregion=self.canvas.bbox("all"))
\ No newline at end of file
+            orders = restaurants_orders.setdefault(rest_name, {})
+            if order_id not in orders:
+                order_restaurants[order_id] = rest_name
+                section_ids.setdefault(rest_name, []).append(order_id)
+            # Existing orders are updated in place and keep their position in the section
+            orders[order_id] = order
+
+        for rest_name, order_ids in finished.items():
+            if not restaurants_orders[rest_name]:
+                del restaurants_orders[rest_name]
+                del section_ids[rest_name]
+                continue
+            ids = section_ids[rest_name]
+            if len(order_ids) * 8 < len(ids):
+                for order_id in order_ids: # Orders mostly finish in arrival order, so these are near the front
+                    ids.remove(order_id)
+            else:
+                done = set(order_ids)
+                section_ids[rest_name] = [order_id for order_id in ids if order_id not in done]
+
+        self._render()
+
+    def _row_count(self):
+        """Number of rows: the title (plus a placeholder when empty), and per restaurant its header
+        and, when expanded, its orders."""
+        count = 1 if self.section_ids else 2
+        for rest_name, ids in self.section_ids.items():
+            count += 1 + (len(ids) if self.expansion_states.get(rest_name, False) else 0)
+        return count
+
+    def _iter_rows(self, first, last):
+        """Yields (index, kind, key) for the rows first..last-1, skipping whole sections before first."""
+        index = 0
+        head = [('title', None)] if self.section_ids else [('title', None), ('empty', None)]
+        for kind, key in head:
+            if first <= index < last:
+                yield index, kind, key
+            index += 1
+        for rest_name, ids in self.section_ids.items():
+            if index >= last:
+                return
+            if first <= index:
+                yield index, 'header', rest_name
+            index += 1
+            if not self.expansion_states.get(rest_name, False):
+                continue
+            start = max(first - index, 0)
+            stop = min(last - index, len(ids))
+            for offset in range(start, stop):
+                yield index + offset, 'order', ids[offset]
+            index += len(ids)
+
+    def _row_text(self, kind, key):
+        if kind == 'title':
+            return "Active Orders (System-Wide)"
+        if kind == 'empty':
+            return "No active orders in the kitchen queue or in transit."
+        if kind == 'header':
+            button_indicator = "▼" if self.expansion_states.get(key, False) else "►"
+            return f"{button_indicator} {key} ({len(self.section_ids[key])} Orders)"
+        order = self.restaurants_orders[self.order_restaurants[key]][key]
+        return (f"ID: {key} | Status: {order.get('state', 'Unknown')} | "
+                f"Items: {order.get('items_ready', 0)}/{order.get('items_total', 0)} Ready")
+
+    def _create_slot(self):
+        canvas = self.canvas
+        return {
+            'bg': canvas.create_rectangle(0, 0, 0, 0, width=0),
+            'text': canvas.create_text(0, 0, anchor='w'),
+            'sep': canvas.create_line(0, 0, 0, 0, fill='#CCCCCC'),
+            'row': None, # (kind, text, key) currently shown
+            'y': None,
+            'width': None,
+        }
+
+    def _render(self):
+        """Points the slot pool at the rows inside the viewport. Items are only reconfigured
+        when the row a slot shows, its position or the canvas width changed."""
+        canvas = self.canvas
+        row_height = self.ROW_HEIGHT
+        width = max(canvas.winfo_width(), 1)
+        total_height = self._row_count() * row_height
+        canvas.configure(scrollregion=(0, 0, width, total_height))
+
+        first = max(int(canvas.canvasy(0) // row_height), 0)
+        visible = canvas.winfo_height() // row_height + 2
+        while len(self.slots) < visible:
+            self.slots.append(self._create_slot())
+
+        # Row i always uses slot i % len(slots), so rows that stay in view keep their slot while scrolling
+        slot_count = len(self.slots)
+        assigned = {}
+        for index, kind, key in self._iter_rows(first, first + visible):
+            assigned[index % slot_count] = (index, kind, key)
+
+        for slot_index, slot in enumerate(self.slots):
+            visible_row = assigned.get(slot_index)
+            if visible_row is None:
+                if slot['row'] is not None:
+                    for item in (slot['bg'], slot['text'], slot['sep']):
+                        canvas.itemconfigure(item, state='hidden')
+                    slot['row'] = None
+                continue
+
+            index, kind, key = visible_row
+            row = (kind, self._row_text(kind, key), key) # Text is formatted for rows in view only
+            y = index * row_height
+            if slot['row'] is None:
+                for item in (slot['bg'], slot['text'], slot['sep']):
+                    canvas.itemconfigure(item, state='normal')
+            if y != slot['y'] or width != slot['width']:
+                canvas.coords(slot['bg'], 5, y + 1, width - 5, y + row_height)
+                canvas.coords(slot['text'], 15, y + row_height / 2)
+                canvas.coords(slot['sep'], 15, y + row_height, width - 15, y + row_height)
+                slot['y'], slot['width'] = y, width
+            if row != slot['row']:
+                text = row[1]
+                font, colour, background = self.ROW_STYLES[kind]
+                canvas.itemconfigure(slot['bg'], fill=background)
+                canvas.itemconfigure(slot['text'], text=text, font=font, fill=colour)
+                canvas.itemconfigure(slot['sep'], state='normal' if kind == 'order' else 'hidden')
+            slot['row'] = row
@@ -0,0 +1,144 @@
+# test_OrderIngestServer.py
+import json
+import socket
+import unittest
+from unittest import mock
+import GUI
+from OrderIngestServer import OrderIngestServer
+from OrderProtocol import decode_ack, decode_orders, encode_message, MAX_KEY, REJECTED
+
+ORDER = [[1, 'pizza', 'small', 'ham']]
+
+
+def free_udp_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class DecodeOrdersTest(unittest.TestCase):
+
+    def test_invalid_keys_are_malformed(self):
+        for key in ([1], "12", 1.0, True, 0, -1, MAX_KEY + 1):
+            with self.subTest(key=key):
+                with self.assertRaises(ValueError):
+                    decode_orders(json.dumps({"orders": ORDER, "key": key}).encode())
+
+    def test_valid_keys(self):
+        for key in (None, 1, 12, MAX_KEY):
+            with self.subTest(key=key):
+                self.assertEqual(decode_orders(json.dumps({"orders": ORDER, "key": key}).encode()), [(key, ORDER)])
+
+    def test_invalid_batches_are_malformed(self):
+        for message in ({"batch": 5}, {"batch": [1]}, {"batch": {"orders": ORDER}}, {"orders": 3}):
+            with self.subTest(message=message):
+                with self.assertRaises(ValueError):
+                    decode_orders(json.dumps(message).encode())
+
+
+class _FailingServer(OrderIngestServer):
+    """Raises from the first message it handles, like an unforeseen bug would."""
+
+    def _handle(self, data, addr, reply):
+        if self.failed == 0:
+            raise RuntimeError("unexpected")
+        super()._handle(data, addr, reply)
+
+
+class _ServerTestCase(unittest.TestCase):
+    """Runs an OrderIngestServer on a free local port; accepts orders with items."""
+
+    def start_server(self, server_class=OrderIngestServer):
+        self.orders = []
+        server = server_class(self.on_order, host='127.0.0.1', port=free_udp_port(), stream_port=None)
+        self.assertTrue(server.start())
+        self.addCleanup(server.stop)
+        client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        client.settimeout(2.0)
+        self.addCleanup(client.close)
+        return server, client
+
+    def on_order(self, items):
+        if not items:
+            return None # Rejected, like AutomatedRestaurantSystem.accept_external_order
+        self.orders.append(items)
+        return 9000 + len(self.orders)
+
+    def send(self, server, client, message):
+        client.sendto(json.dumps(message).encode(), ('127.0.0.1', server.port))
+
+
+class IngestServerTest(_ServerTestCase):
+
+    def test_bad_messages_do_not_stop_intake(self):
+        server, client = self.start_server()
+        self.send(server, client, {"orders": ORDER, "key": [1]})
+        self.send(server, client, {"batch": 5})
+        self.send(server, client, {"orders": ORDER, "key": 12})
+        self.assertEqual(decode_ack(client.recv(65535)), [(12, 9001)])
+        self.assertEqual(self.orders, [ORDER])
+        self.assertEqual((server.received, server.malformed, server.failed), (3, 2, 0))
+
+    def test_rejected_order_gets_negative_ack(self):
+        server, client = self.start_server()
+        for _ in range(2): # A resend is judged again, not answered from the dedup cache
+            self.send(server, client, {"orders": [], "key": 13})
+            self.assertEqual(decode_ack(client.recv(65535)), [(13, REJECTED)])
+        self.assertEqual((self.orders, server.duplicates), ([], 0))
+
+    def test_unexpected_error_is_counted_and_intake_continues(self):
+        server, client = self.start_server(_FailingServer)
+        self.send(server, client, {"orders": ORDER, "key": 11})
+        self.send(server, client, {"orders": ORDER, "key": 12})
+        self.assertEqual(decode_ack(client.recv(65535)), [(12, 9001)])
+        self.assertEqual(server.failed, 1)
+
+
+
+class _ResettingSocket:
+    """UDP client socket whose first `resets` receives fail the way Windows reports an ICMP
+    port-unreachable for an earlier datagram (WSAECONNRESET)."""
+
+    def __init__(self, sock, resets):
+        self.sock = sock
+        self.resets = resets
+        self.sent = 0
+
+    def sendto(self, payload, addr):
+        self.sent += 1
+        return self.sock.sendto(payload, addr)
+
+    def settimeout(self, timeout):
+        self.sock.settimeout(timeout)
+
+    def recvfrom(self, size):
+        if self.resets > 0:
+            self.resets -= 1
+            raise ConnectionResetError(10054, "An existing connection was forcibly closed by the remote host")
+        return self.sock.recvfrom(size)
+
+
+class SendDatagramTest(_ServerTestCase):
+
+    def send_with(self, sock, port):
+        key = 21
+        payload = encode_message({"orders": ORDER, "key": key})
+        with mock.patch.multiple(GUI, order_sock=sock, TARGET_IP='127.0.0.1', TARGET_PORT=port, ACK_TIMEOUT=0.05):
+            return GUI.send_datagram(payload, key)
+
+    def test_connection_reset_is_a_missed_ack(self):
+        server, client = self.start_server()
+        sock = _ResettingSocket(client, resets=1)
+        self.assertEqual(self.send_with(sock, server.port), 9001)
+
+    def test_connection_resets_keep_resending(self):
+        client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.addCleanup(client.close)
+        sock = _ResettingSocket(client, resets=float('inf')) # Nothing listens: every receive resets
+        with self.assertRaises(TimeoutError):
+            self.send_with(sock, free_udp_port())
+        self.assertEqual(sock.sent, GUI.SEND_ATTEMPTS)
+
+
+if __name__ == '__main__':
+    unittest.main()